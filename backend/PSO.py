@@ -1,88 +1,109 @@
 import numpy as np
 import json
 import time
+import zones
+
+P_TYPES = zones.P_TYPES
 
 class PSOPersonnelAllocator:
     """
     This class encapsulates the entire Particle Swarm Optimization logic
     for allocating emergency response personnel. It now includes detailed logging.
     """
+    algorithm_name = "PSO"
+
     def __init__(self, barangay_data, personnel_availability, flood_levels, pso_params, weights, lambda_c):
         """
         Initializes the PSO Allocator with all necessary data and parameters.
+        `flood_levels` is an array aligned with `barangay_data` and
+        `personnel_availability` an array of [srr, health, log] rows (only its
+        totals are used); name-keyed dicts are still accepted for both.
         """
         self.barangay_data = barangay_data
-        self.personnel_availability = personnel_availability
-        self.flood_levels = flood_levels
         self.pso_params = pso_params
         self.weights = weights
         self.lambda_c = lambda_c
 
-        self.target_barangays = {b_name: b_data for b_name, b_data in self.barangay_data.items() if self.flood_levels.get(b_name, 0) >= 0.5}
-        self.num_target_barangays = len(self.target_barangays)
+        self.zone_names = list(self.barangay_data)
+        if isinstance(flood_levels, dict):
+            flood_levels = np.array([flood_levels.get(name, 0) for name in self.zone_names], dtype=float)
+        if isinstance(personnel_availability, dict):
+            personnel_availability = np.array([[p[p_type] for p_type in P_TYPES] for p in personnel_availability.values()]).reshape(-1, 3)
+        self.flood_levels = flood_levels
+        self.personnel_availability = personnel_availability
+
+        # Zones are handled by index from here on; names are only used to decode results
+        self.target_indices = np.flatnonzero(self.flood_levels >= 0.5)
+        self.target_names = [self.zone_names[i] for i in self.target_indices]
+        self.num_target_barangays = len(self.target_indices)
 
-        self.total_personnel = {
-            'srr': sum(p['srr'] for p in self.personnel_availability.values()),
-            'health': sum(p['health'] for p in self.personnel_availability.values()),
-            'log': sum(p['log'] for p in self.personnel_availability.values())
-        }
+        totals = self.personnel_availability.sum(axis=0)
+        self.total_personnel = {p_type: int(totals[i]) for i, p_type in enumerate(P_TYPES)}
         self.total_personnel_all_types = sum(self.total_personnel.values())
 
+        self.risk = np.array([self.barangay_data[name]['risk'] for name in self.target_names], dtype=float)
+        self.population = np.array([self.barangay_data[name]['population'] for name in self.target_names], dtype=float)
+        self.risk_weight = np.log1p(self.risk)
+        self.population_weight = np.log1p(self.population)
+
         self.demand = self._calculate_demand()
 
     def _calculate_demand(self):
-        """ Calculates the personnel demand for each targeted barangay and classification. """
-        demand = {}
-        for name, data in self.target_barangays.items():
-            flood_level = self.flood_levels.get(name, 0)
-            demand[name] = {
-                'srr': round(self.lambda_c['srr'] * data['risk'] * flood_level * np.log1p(data['population'])),
-                'health': round(self.lambda_c['health'] * data['risk'] * flood_level * np.log1p(data['population'])),
-                'log': round(self.lambda_c['log'] * data['risk'] * flood_level * np.log1p(data['population']))
-            }
-        return demand
-
-    # --- Objective Functions (No changes here) ---
+        """ Calculates the personnel demand (zones x [srr, health, log]) for each targeted barangay. """
+        lambdas = np.array([self.lambda_c[p_type] for p_type in P_TYPES])
+        flood_level = self.flood_levels[self.target_indices]
+        return np.round(lambdas[None, :] * self.risk[:, None] * flood_level[:, None] * self.population_weight[:, None])
+
+    def _as_matrix(self, allocation):
+        """ Allocation as a zones x [srr, health, log] array (from a particle or a name-keyed dict). """
+        if isinstance(allocation, dict):
+            return np.array([[allocation[name][p_type] for p_type in P_TYPES] for name in self.target_names], dtype=float).reshape(-1, 3)
+        return np.asarray(allocation, dtype=float).reshape(-1, 3)
+
+    def _satisfaction(self, allocation, demand):
+        """ Per-zone, per-type demand satisfaction: min(1, allocated / demand), or 1 without demand. """
+        return np.where(demand > 0, np.minimum(1, allocation / np.maximum(demand, 1)), 1)
+
+    # --- Objective Functions (on zones x [srr, health, log] arrays) ---
     def _objective1_coverage(self, allocation):
-        if not self.target_barangays: return 0
-        zones_with_personnel = sum(1 for barangay_alloc in allocation.values() if sum(barangay_alloc.values()) > 0)
+        if not self.num_target_barangays: return 0
+        zones_with_personnel = np.count_nonzero(allocation.sum(axis=1) > 0)
         return zones_with_personnel / self.num_target_barangays
 
     def _objective2_prioritization(self, allocation):
         if self.total_personnel_all_types == 0: return 0
-        numerator = sum(sum(barangay_alloc.values()) * np.log1p(self.target_barangays[name]['risk']) for name, barangay_alloc in allocation.items())
+        numerator = allocation.sum(axis=1) @ self.risk_weight
         return numerator / self.total_personnel_all_types
 
     def _objective3_distribution(self, allocation):
-        zone_totals = [sum(barangay_alloc.values()) for barangay_alloc in allocation.values()]
-        if not zone_totals: return 0
+        zone_totals = allocation.sum(axis=1)
+        if not len(zone_totals): return 0
         mean = np.mean(zone_totals)
         std_dev = np.std(zone_totals)
         return std_dev / (mean + 1e-6) if mean > 0 else 0
 
     def _objective4_population(self, allocation):
         if self.total_personnel_all_types == 0: return 0
-        numerator = sum(sum(barangay_alloc.values()) * np.log1p(self.target_barangays[name]['population']) for name, barangay_alloc in allocation.items())
+        numerator = allocation.sum(axis=1) @ self.population_weight
         return numerator / self.total_personnel_all_types
 
     def _objective5_demand(self, allocation):
-        if not self.target_barangays: return 0
-        total_demand_satisfaction = 0
+        if not self.num_target_barangays: return 0
         num_classifications = 3
-        for name, barangay_alloc in allocation.items():
-            for p_type in ['srr', 'health', 'log']:
-                demand_val = self.demand.get(name, {}).get(p_type, 0)
-                alloc_val = barangay_alloc[p_type]
-                satisfaction = min(1, alloc_val / demand_val) if demand_val > 0 else 1
-                total_demand_satisfaction += satisfaction
+        total_demand_satisfaction = self._satisfaction(allocation, self.demand).sum()
         return total_demand_satisfaction / (self.num_target_barangays * num_classifications)
 
+    def objective_values(self, allocation):
+        """ Returns the five raw objective values (obj1..obj5) of a particle or allocation. """
+        allocation = self._as_matrix(allocation)
+        return (self._objective1_coverage(allocation),
+                self._objective2_prioritization(allocation),
+                self._objective3_distribution(allocation),
+                self._objective4_population(allocation),
+                self._objective5_demand(allocation))
+
     def fitness_function(self, allocation):
-        obj1 = self._objective1_coverage(allocation)
-        obj2 = self._objective2_prioritization(allocation)
-        obj3 = self._objective3_distribution(allocation)
-        obj4 = self._objective4_population(allocation)
-        obj5 = self._objective5_demand(allocation)
+        obj1, obj2, obj3, obj4, obj5 = self.objective_values(allocation)
         fitness = (self.weights['w1'] * obj1 +
                    self.weights['w2'] * obj2 -
                    self.weights['w3'] * obj3 +
@@ -91,9 +112,10 @@ class PSOPersonnelAllocator:
         return fitness
 
     def _decode_particle(self, particle):
+        """ Reattaches barangay names to a particle (only needed for results). """
         allocation = {}
         idx = 0
-        for name in self.target_barangays:
+        for name in self.target_names:
             allocation[name] = {
                 'srr': int(particle[idx]),
                 'health': int(particle[idx + 1]),
@@ -112,9 +134,33 @@ class PSOPersonnelAllocator:
                 particle[i::3] = np.round(allocations * ratio)
         return particle
 
-    def run_pso(self):
+    def _refine_pbests(self, iteration, pbest_pos, pbest_fitness):
+        """
+        Called after every iteration. Subclasses may improve personal bests in
+        place and return True when they changed anything.
+        """
+        return False
+
+    def _accept_pbest(self, j, position, fitness, pbest_position, pbest_fitness):
+        """ Whether particle j's new position replaces its personal best (higher fitness for plain PSO). """
+        return fitness > pbest_fitness
+
+    def _social_guide(self, j, gbest_pos):
+        """ Position particle j is pulled towards by the social term (gbest for plain PSO). """
+        return gbest_pos
+
+    def _end_iteration(self, iteration):
+        """ Called once at the end of every iteration, after _refine_pbests. """
+
+    def extra_results(self):
+        """ Extra items appended to the run_pso_simulation result (none for plain PSO). """
+        return []
+
+    def run_pso(self, should_stop=None):
         """
         Executes the PSO algorithm and returns detailed logs.
+        If given, `should_stop` is checked once per iteration; when it returns
+        True the search stops early and the best-so-far result is returned.
         """
         if self.num_target_barangays == 0:
             return { "allocation": {}, "fitness_score": 0 }, [], { "allocation": {}, "fitness_score": 0 }
@@ -137,7 +183,7 @@ class PSOPersonnelAllocator:
 
         particles_vel = np.zeros((num_particles, dim))
         pbest_pos = np.copy(particles_pos)
-        pbest_fitness = np.array([self.fitness_function(self._decode_particle(p)) for p in pbest_pos])
+        pbest_fitness = np.array([self.fitness_function(p) for p in pbest_pos])
 
         gbest_idx = np.argmax(pbest_fitness)
         gbest_pos = pbest_pos[gbest_idx].copy()
@@ -151,27 +197,43 @@ class PSOPersonnelAllocator:
 
         # --- Prepare for iteration logging ---
         iteration_log = []
+        convergence = []
 
         # PSO main loop
         for i in range(num_iterations):
+            # --- Cancellation checkpoint ---
+            if should_stop is not None and should_stop():
+                print(f"PSO cancelled after {i} iterations.")
+                break
+
             for j in range(num_particles):
                 r1, r2 = np.random.rand(2)
                 cognitive_vel = self.pso_params['c1'] * r1 * (pbest_pos[j] - particles_pos[j])
-                social_vel = self.pso_params['c2'] * r2 * (gbest_pos - particles_pos[j])
+                social_vel = self.pso_params['c2'] * r2 * (self._social_guide(j, gbest_pos) - particles_pos[j])
                 particles_vel[j] = self.pso_params['w'] * particles_vel[j] + cognitive_vel + social_vel
 
                 particles_pos[j] = np.round(particles_pos[j] + particles_vel[j])
                 particles_pos[j] = np.maximum(0, particles_pos[j])
                 particles_pos[j] = self._enforce_constraints(particles_pos[j])
 
-                current_fitness = self.fitness_function(self._decode_particle(particles_pos[j]))
-                if current_fitness > pbest_fitness[j]:
+                current_fitness = self.fitness_function(particles_pos[j])
+                if self._accept_pbest(j, particles_pos[j], current_fitness, pbest_pos[j], pbest_fitness[j]):
                     pbest_fitness[j] = current_fitness
                     pbest_pos[j] = particles_pos[j].copy()
 
-                    if current_fitness > gbest_fitness:
-                        gbest_fitness = current_fitness
-                        gbest_pos = particles_pos[j].copy()
+                if current_fitness > gbest_fitness:
+                    gbest_fitness = current_fitness
+                    gbest_pos = particles_pos[j].copy()
+
+            # --- Hook for hybrid variants (no-op for plain PSO) ---
+            if self._refine_pbests(i, pbest_pos, pbest_fitness):
+                best_idx = np.argmax(pbest_fitness)
+                if pbest_fitness[best_idx] > gbest_fitness:
+                    gbest_fitness = pbest_fitness[best_idx]
+                    gbest_pos = pbest_pos[best_idx].copy()
+            self._end_iteration(i)
+
+            convergence.append(float(gbest_fitness))
 
             # --- Log progress every 50 iterations ---
             if (i + 1) % 50 == 0:
@@ -184,58 +246,72 @@ class PSOPersonnelAllocator:
         # --- Capture Final State ---
         final_result = {
             "allocation": self._decode_particle(gbest_pos),
-            "fitness_score": float(gbest_fitness)
+            "fitness_score": float(gbest_fitness),
+            "convergence": convergence
         }
 
         return initial_state, iteration_log, final_result
 
 
-def run_pso_simulation(barangay_input_data):
+# Default PSO Parameters
+DEFAULT_PSO_PARAMS = {'iterations': 300, 'num_particles': 100, 'w': 0.5, 'c1': 1.5, 'c2': 1.5}
+
+# Static Data
+STATIC_BARANGAY_DATA = {
+    'Addition Hills': {'population': 108896, 'risk': 3},
+    'Bagong Silang': {'population': 4939, 'risk': 2},
+    'Barangka Drive': {'population': 15474, 'risk': 2},
+    'Barangka Ibaba': {'population': 9040, 'risk': 3},
+    'Barangka Ilaya': {'population': 22334, 'risk': 2},
+    'Barangka Itaas': {'population': 11242, 'risk': 1},
+    'Buayang Bato': {'population': 2913, 'risk': 3},
+    'Burol': {'population': 2650, 'risk': 1},
+    'Daang Bakal': {'population': 4529, 'risk': 2},
+    'Hagdang Bato Itaas': {'population': 10267, 'risk': 1},
+    'Hagdang Bato Libis': {'population': 6715, 'risk': 2},
+    'Harapin Ang Bukas': {'population': 4244, 'risk': 2},
+    'Highway Hills': {'population': 43267, 'risk': 2},
+    'Hulo': {'population': 31335, 'risk': 3},
+    'Mabini-J. Rizal': {'population': 7882, 'risk': 2},
+    'Malamig': {'population': 12054, 'risk': 2},
+    'Mauway': {'population': 25800, 'risk': 2},
+    'Namayan': {'population': 7670, 'risk': 3},
+    'New Zañiga': {'population': 8444, 'risk': 2},
+    'Old Zañiga': {'population': 6636, 'risk': 2},
+    'Pag-asa': {'population': 4195, 'risk': 2},
+    'Plainview': {'population': 29378, 'risk': 2},
+    'Pleasant Hills': {'population': 6003, 'risk': 1},
+    'Poblacion': {'population': 16333, 'risk': 3},
+    'San Jose': {'population': 8483, 'risk': 2},
+    'Vergara': {'population': 4357, 'risk': 2},
+    'Wack-Wack Greenhills': {'population': 10678, 'risk': 1}
+}
+
+# Integer index over the static table; requests are resolved against it once
+ZONE_TABLE = zones.ZoneTable(STATIC_BARANGAY_DATA)
+
+
+def run_pso_simulation(barangay_input_data, should_stop=None, allocator_class=PSOPersonnelAllocator, pso_params=None, detailed=False):
     """
     Main function to run the PSO simulation.
+    `should_stop` is an optional cancellation check passed to run_pso.
+    `allocator_class` and `pso_params` let PSO variants reuse this driver.
+    With `detailed`, a dict with the initial state, iteration log and
+    per-iteration convergence trace is appended to the returned list,
+    followed by the allocator's extra_results().
     """
-    # Static Data
-    static_barangay_data = {
-        'Addition Hills': {'population': 108896, 'risk': 3},
-        'Bagong Silang': {'population': 4939, 'risk': 2},
-        'Barangka Drive': {'population': 15474, 'risk': 2},
-        'Barangka Ibaba': {'population': 9040, 'risk': 3},
-        'Barangka Ilaya': {'population': 22334, 'risk': 2},
-        'Barangka Itaas': {'population': 11242, 'risk': 1},
-        'Buayang Bato': {'population': 2913, 'risk': 3},
-        'Burol': {'population': 2650, 'risk': 1},
-        'Daang Bakal': {'population': 4529, 'risk': 2},
-        'Hagdang Bato Itaas': {'population': 10267, 'risk': 1},
-        'Hagdang Bato Libis': {'population': 6715, 'risk': 2},
-        'Harapin Ang Bukas': {'population': 4244, 'risk': 2},
-        'Highway Hills': {'population': 43267, 'risk': 2},
-        'Hulo': {'population': 31335, 'risk': 3},
-        'Mabini-J. Rizal': {'population': 7882, 'risk': 2},
-        'Malamig': {'population': 12054, 'risk': 2},
-        'Mauway': {'population': 25800, 'risk': 2},
-        'Namayan': {'population': 7670, 'risk': 3},
-        'New Zañiga': {'population': 8444, 'risk': 2},
-        'Old Zañiga': {'population': 6636, 'risk': 2},
-        'Pag-asa': {'population': 4195, 'risk': 2},
-        'Plainview': {'population': 29378, 'risk': 2},
-        'Pleasant Hills': {'population': 6003, 'risk': 1},
-        'Poblacion': {'population': 16333, 'risk': 3},
-        'San Jose': {'population': 8483, 'risk': 2},
-        'Vergara': {'population': 4357, 'risk': 2},
-        'Wack-Wack Greenhills': {'population': 10678, 'risk': 1}
-    }
-
-    # Process Input Data
-    personnel_availability = {b['name']: b['personnel'] for b in barangay_input_data}
-    flood_levels = {b['name']: b['waterLevel'] for b in barangay_input_data}
+    # Process Input Data (a zones.ZoneInput, or the raw /simulate records)
+    if not isinstance(barangay_input_data, zones.ZoneInput):
+        barangay_input_data = ZONE_TABLE.load(barangay_input_data)
 
     # PSO Parameters
-    pso_params = {'iterations': 300, 'num_particles': 100, 'w': 0.5, 'c1': 1.5, 'c2': 1.5}
+    if pso_params is None:
+        pso_params = DEFAULT_PSO_PARAMS
     weights = {'w1': 0.2, 'w2': 0.2, 'w3': 0.2, 'w4': 0.2, 'w5': 0.2}
     lambda_c = {'srr': 0.5, 'health': 0.3, 'log': 0.2}
 
     # Initialize Simulation
-    allocator = PSOPersonnelAllocator(static_barangay_data, personnel_availability, flood_levels, pso_params, weights, lambda_c)
+    allocator = allocator_class(STATIC_BARANGAY_DATA, barangay_input_data.personnel, barangay_input_data.water_levels, pso_params, weights, lambda_c)
 
     print("\nTotal Available Personnel Received from Frontend:")
     print(f"  SRR: {allocator.total_personnel['srr']}")
@@ -244,12 +320,12 @@ def run_pso_simulation(barangay_input_data):
 
     # --- Run Simulation and Measure Time ---
     start_time = time.time()
-    initial_state, iteration_log, final_result = allocator.run_pso()
+    initial_state, iteration_log, final_result = allocator.run_pso(should_stop)
     end_time = time.time()
     execution_time = end_time - start_time
 
     # --- Log results to the terminal in a readable format ---
-    print("\n--- PSO SIMULATION LOG ---")
+    print(f"\n--- {allocator.algorithm_name} SIMULATION LOG ---")
 
     # Log Initial State
     print("\n[INITIAL STATE]")
@@ -283,11 +359,19 @@ def run_pso_simulation(barangay_input_data):
     print("\n--- END OF SIMULATION LOG ---\n")
 
     # Return the final allocation, fitness score, and execution time as a list (array)
-    return [
+    result = [
         final_result['allocation'],
         final_result['fitness_score'],
         float(execution_time)
     ]
+    if detailed:
+        result.append({
+            "initial_state": initial_state,
+            "iteration_log": iteration_log,
+            "convergence": final_result.get('convergence', [])
+        })
+    result.extend(allocator.extra_results())
+    return result
 
 
 if __name__ == '__main__':
@@ -295,12 +379,12 @@ if __name__ == '__main__':
     print("--- Running Test Simulation ---")
 
     sample_frontend_data = [
-        {"id": "0", "name": "Addition Hills", "waterLevel": 2.5, "personnel": {"srr": 400, "health": 400, "log": 400}},
-        {"id": "1", "name": "Bagong Silang", "waterLevel": 0.5, "personnel": {"srr": 0, "health": 0, "log": 0}},
-        {"id": "2", "name": "Barangka Drive", "waterLevel": 1.1, "personnel": {"srr": 0, "health": 0, "log": 0}},
-        {"id": "3", "name": "Barangka Ibaba", "waterLevel": 3.0, "personnel": {"srr": 0, "health": 0, "log": 0}},
+        {"id": "1", "name": "Addition Hills", "waterLevel": 2.5, "personnel": {"srr": 400, "health": 400, "log": 400}},
+        {"id": "2", "name": "Bagong Silang", "waterLevel": 0.5, "personnel": {"srr": 0, "health": 0, "log": 0}},
+        {"id": "3", "name": "Barangka Drive", "waterLevel": 1.1, "personnel": {"srr": 0, "health": 0, "log": 0}},
+        {"id": "4", "name": "Barangka Ibaba", "waterLevel": 3.0, "personnel": {"srr": 0, "health": 0, "log": 0}},
         {"id": "11", "name": "Hagdang Bato Libis", "waterLevel": 1.8, "personnel": {"srr": 0, "health": 0, "log": 0}},
-        {"id": "23", "name": "San Jose", "waterLevel": 1.2, "personnel": {"srr": 0, "health": 0, "log": 0}}
+        {"id": "25", "name": "San Jose", "waterLevel": 1.2, "personnel": {"srr": 0, "health": 0, "log": 0}}
     ]
 
     # The function will now print logs internally and return a simple list.
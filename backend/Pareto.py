@@ -0,0 +1,235 @@
+import numpy as np
+import json
+import PSO
+
+OBJECTIVE_NAMES = ['coverage', 'prioritization', 'distribution', 'population', 'demand']
+
+# fitness_function subtracts obj3 (imbalance) and adds the others, so obj3 is
+# minimized; flipping its sign lets every comparison below maximize
+OBJECTIVE_SIGNS = np.array([1, 1, -1, 1, 1])
+
+
+def dominance(a, b):
+    """
+    dominance[i, j]: row a[i] is at least as good as b[j] everywhere and
+    better somewhere (all objectives maximized).
+    """
+    return (a[:, None] >= b[None]).all(axis=-1) & (a[:, None] > b[None]).any(axis=-1)
+
+
+def non_dominated(objectives):
+    """ Mask of the rows of an (m, k) array that no other row dominates (the first front). """
+    return ~dominance(objectives, objectives).any(axis=0)
+
+
+def crowding_distance(objectives):
+    """ Crowding distance of each row of an (m, k) front; boundary rows get inf. """
+    m = len(objectives)
+    if m <= 2:
+        return np.full(m, np.inf)
+    order = np.argsort(objectives, axis=0)
+    sorted_obj = np.take_along_axis(objectives, order, axis=0)
+    span = sorted_obj[-1] - sorted_obj[0]
+    span[span == 0] = 1
+    gaps = np.empty_like(sorted_obj, dtype=float)
+    gaps[1:-1] = (sorted_obj[2:] - sorted_obj[:-2]) / span
+    gaps[[0, -1]] = np.inf
+    distance = np.empty_like(gaps)
+    np.put_along_axis(distance, order, gaps, axis=0)
+    return distance.sum(axis=1)
+
+
+class ParetoArchive:
+    """
+    Archive of non-dominated allocations, each kept with its five raw
+    objective values. Any weight vector can then be answered from the
+    archive without re-running the optimizer. Allocations are stored as
+    particle arrays and only decoded with `zone_names` when selected.
+    """
+    def __init__(self, max_size=500, anchor_weights=None, zone_names=()):
+        self.max_size = max_size
+        self.zone_names = list(zone_names)
+        # The best solution for these weights always survives truncation, so
+        # select(anchor_weights) matches a plain weighted run
+        self.anchor_weights = anchor_weights
+        self.objectives = np.empty((0, len(OBJECTIVE_NAMES)))
+        self.positions = np.empty((0, len(self.zone_names) * len(PSO.P_TYPES)))
+
+    def __len__(self):
+        return len(self.objectives)
+
+    def add(self, objectives, allocations):
+        """ Merges a batch of (objective values, particle) pairs into the archive. """
+        objectives = np.asarray(objectives, dtype=float).reshape(-1, len(OBJECTIVE_NAMES))
+        positions = np.asarray(allocations, dtype=float).reshape(len(objectives), -1)
+        signed = objectives * OBJECTIVE_SIGNS
+        archived = self.objectives * OBJECTIVE_SIGNS
+
+        # Most of a batch is already covered by the archive (dominated or
+        # equal), so drop those before any batch-sized comparison
+        new = ~(archived[:, None] >= signed[None]).all(axis=-1).any(axis=0)
+        _, unique_idx = np.unique(signed[new], axis=0, return_index=True)
+        new = np.flatnonzero(new)[np.sort(unique_idx)]
+        new = new[non_dominated(signed[new])]
+        if not len(new):
+            return
+
+        # Archived solutions dominated by a newcomer leave the archive
+        kept = ~dominance(signed[new], archived).any(axis=0)
+        merged = np.vstack([self.objectives[kept], objectives[new]])
+        merged_positions = np.vstack([self.positions[kept], positions[new]])
+
+        # Over capacity: keep the most spread-out solutions
+        if len(merged) > self.max_size:
+            distance = crowding_distance(merged * OBJECTIVE_SIGNS)
+            if self.anchor_weights is not None:
+                distance[np.argmax(self._scores(merged, self.anchor_weights))] = np.inf
+            keep = np.sort(np.argsort(-distance, kind='stable')[:self.max_size])
+            merged, merged_positions = merged[keep], merged_positions[keep]
+
+        self.objectives = merged
+        self.positions = merged_positions
+
+    def leaders(self, signed_weights):
+        """
+        Leader for each row of `signed_weights` (already multiplied by
+        OBJECTIVE_SIGNS): the archived position that scores best for it.
+        """
+        return self.positions[np.argmax(self.objectives @ signed_weights.T, axis=0)]
+
+    def _scores(self, objectives, weights):
+        """ Weighted fitness of each row, as in fitness_function. """
+        w = np.array([weights['w1'], weights['w2'], weights['w3'], weights['w4'], weights['w5']])
+        return objectives @ (w * OBJECTIVE_SIGNS)
+
+    def _decode(self, particle):
+        counts = np.asarray(particle).reshape(-1, len(PSO.P_TYPES)).astype(int).tolist()
+        return {name: dict(zip(PSO.P_TYPES, row)) for name, row in zip(self.zone_names, counts)}
+
+    def _entry(self, idx, fitness=None):
+        entry = {
+            "allocation": self._decode(self.positions[idx]),
+            "objectives": dict(zip(OBJECTIVE_NAMES, self.objectives[idx].tolist())),
+        }
+        if fitness is not None:
+            entry["fitness_score"] = float(fitness)
+        return entry
+
+    def select(self, weights):
+        """ Returns the archived solution with the best fitness for `weights` (w1..w5). """
+        if not len(self):
+            return {"allocation": {}, "objectives": {}, "fitness_score": 0}
+        scores = self._scores(self.objectives, weights)
+        best = int(np.argmax(scores))
+        return self._entry(best, scores[best])
+
+    def front(self):
+        """ Objective values of every archived solution (no allocations). """
+        return [dict(zip(OBJECTIVE_NAMES, row)) for row in self.objectives.tolist()]
+
+
+class ParetoPSOPersonnelAllocator(PSO.PSOPersonnelAllocator):
+    """
+    Multi-objective mode for PSO. Every allocation the swarm evaluates is
+    offered to a ParetoArchive, and each particle is steered by its own
+    weight vector: its personal best is judged with it, and its leader is the
+    archived solution that scores best for it (instead of the single gbest).
+    The vectors cover the run's weights, every corner of the w1..w5 simplex
+    and random points in between, so one run explores the whole front.
+    """
+    algorithm_name = "Pareto PSO"
+
+    def __init__(self, barangay_data, personnel_availability, flood_levels, pso_params, weights, lambda_c):
+        super().__init__(barangay_data, personnel_availability, flood_levels, pso_params, weights, lambda_c)
+        self.archive = ParetoArchive(pso_params.get('archive_size', 500), weights, self.target_names)
+        self._evaluated = []
+        self._leaders = None
+        self._last_objectives = None
+        self._pbest_scores = {}
+
+        num_particles = pso_params['num_particles']
+        k = len(OBJECTIVE_NAMES)
+        # alpha < 1 puts more particles near the corners and edges of the simplex,
+        # which the run's own weights alone would never reach
+        particle_weights = np.random.dirichlet(np.full(k, 0.5), num_particles)
+        anchors = np.vstack([[weights[f'w{i + 1}'] for i in range(k)], np.eye(k)])[:num_particles]
+        particle_weights[:len(anchors)] = anchors
+        # Signed, so a higher score is better for every particle
+        self.particle_weights = particle_weights * OBJECTIVE_SIGNS
+
+    def objective_values(self, allocation):
+        objectives = super().objective_values(allocation)
+        self._last_objectives = objectives
+        # Particles are updated in place, so archive a copy
+        self._evaluated.append((objectives, self._as_matrix(allocation).flatten()))
+        return objectives
+
+    def _flush_evaluated(self):
+        """ Moves the allocations evaluated since the last flush into the archive. """
+        if self._evaluated:
+            objectives, allocations = zip(*self._evaluated)
+            self.archive.add(objectives, allocations)
+            self._evaluated = []
+
+    def _accept_pbest(self, j, position, fitness, pbest_position, pbest_fitness):
+        # Personal bests are judged with the particle's own weights
+        pbest_score = self._pbest_scores.get(j)
+        if pbest_score is None:
+            pbest_score = np.dot(super().objective_values(pbest_position), self.particle_weights[j])
+        score = np.dot(self._last_objectives, self.particle_weights[j])
+        accept = score > pbest_score
+        self._pbest_scores[j] = score if accept else pbest_score
+        return accept
+
+    def _social_guide(self, j, gbest_pos):
+        # Until the archive has been filled, follow gbest as plain PSO does
+        return gbest_pos if self._leaders is None else self._leaders[j]
+
+    def _end_iteration(self, iteration):
+        # Archive once per iteration so the front is updated on batches, not single points
+        self._flush_evaluated()
+        self._leaders = self.archive.leaders(self.particle_weights)
+
+    def extra_results(self):
+        self._flush_evaluated()
+        print(f"  Pareto front size: {len(self.archive)}")
+        return [self.archive]
+
+
+# Same swarm settings as PSO, plus the archive capacity
+DEFAULT_PARETO_PARAMS = {**PSO.DEFAULT_PSO_PARAMS, 'archive_size': 500}
+
+
+def run_pareto_simulation(barangay_input_data, should_stop=None, detailed=False, pso_params=None):
+    """
+    Main function to run the multi-objective (Pareto) PSO simulation.
+    Returns the usual [allocation, fitness, time] (plus the details dict when
+    `detailed`, as in run_pso_simulation) with the ParetoArchive last.
+    `pso_params` overrides DEFAULT_PARETO_PARAMS.
+    """
+    if pso_params is None:
+        pso_params = DEFAULT_PARETO_PARAMS
+    return PSO.run_pso_simulation(barangay_input_data, should_stop,
+                                  allocator_class=ParetoPSOPersonnelAllocator, pso_params=pso_params,
+                                  detailed=detailed)
+
+
+if __name__ == '__main__':
+    print("--- Running Pareto Test Simulation ---")
+
+    sample_frontend_data = [
+        {"id": "1", "name": "Addition Hills", "waterLevel": 2.5, "personnel": {"srr": 400, "health": 400, "log": 400}},
+        {"id": "2", "name": "Bagong Silang", "waterLevel": 0.5, "personnel": {"srr": 0, "health": 0, "log": 0}},
+        {"id": "3", "name": "Barangka Drive", "waterLevel": 1.1, "personnel": {"srr": 0, "health": 0, "log": 0}},
+        {"id": "4", "name": "Barangka Ibaba", "waterLevel": 3.0, "personnel": {"srr": 0, "health": 0, "log": 0}},
+        {"id": "11", "name": "Hagdang Bato Libis", "waterLevel": 1.8, "personnel": {"srr": 0, "health": 0, "log": 0}},
+        {"id": "25", "name": "San Jose", "waterLevel": 1.2, "personnel": {"srr": 0, "health": 0, "log": 0}}
+    ]
+
+    allocation, fitness, execution_time, archive = run_pareto_simulation(sample_frontend_data)
+
+    print("--- Best archived solutions for a few weightings ---")
+    for weights in ({'w1': 0.2, 'w2': 0.2, 'w3': 0.2, 'w4': 0.2, 'w5': 0.2},
+                    {'w1': 0.6, 'w2': 0.1, 'w3': 0.1, 'w4': 0.1, 'w5': 0.1},
+                    {'w1': 0.1, 'w2': 0.1, 'w3': 0.6, 'w4': 0.1, 'w5': 0.1}):
+        print(json.dumps({"weights": weights, **archive.select(weights)}, indent=2))
@@ -1,123 +1,493 @@
+"""
+Run-history store and headless analysis of optimizer runs.
+
+Runs are kept in a SQLite database (one row per run, indexed by algorithm,
+scenario hash, params hash and date), so any number of runs can be recorded
+and summarised. Plotting and statistics libraries are only imported when a
+plot or test is actually requested, and figures are written to files.
+
+Usage:
+    python analysis.py record --algorithm pso --runs 30 --scenario scenario.json
+    python analysis.py import-csv --results pso_results.csv --convergence convergence.csv
+    python analysis.py summary [--algorithm pso] [--since 2025-01-01]
+    python analysis.py compare --algorithms pso,fa
+    python analysis.py plot --out plots/
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import datetime, timezone
+
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy import stats
-from matplotlib.ticker import ScalarFormatter
-
-df2 = pd.read_csv('pso_results.csv')
-
-# Extract columns into lists
-execution_time = df2['Time (s)'].tolist()
-fitness_score = df2['Fitness Score'].tolist()
-
-
-df = pd.read_csv('convergence.csv', index_col=0)
-mean_row = df.loc['Mean']
-convergence_curve = mean_row.to_numpy()
-iterations = list(range(1, len(convergence_curve) + 1))
-
-
-print("PSO Analysis - 30 Runs")
-print("=" * 30)
-
-# Basic statistics
-print(f"\nFitness Score Stats:")
-print(f"Best: {min(fitness_score):.6f}")
-print(f"Worst: {max(fitness_score):.6f}")
-print(f"Mean: {np.mean(fitness_score):.6f}")
-print(f"Std: {np.std(fitness_score):.6f}")
-
-print(f"\nExecution Time Stats:")
-print(f"Min: {min(execution_time):.2f}s")
-print(f"Max: {max(execution_time):.2f}s")
-print(f"Mean: {np.mean(execution_time):.2f}s")
-print(f"Std: {np.std(execution_time):.2f}s")
-
-# Create separate figures for each plot
-
-# Figure 1: Fitness Score Line Plot
-plt.figure(figsize=(10, 6))
-plt.plot(range(1, 31), fitness_score, 'bo-', linewidth=2, markersize=6)
-plt.title('Fitness Scores (30 Runs)', fontweight='bold', fontsize=14)
-plt.xlabel('Run Number', fontsize=12)
-plt.ylabel('Fitness Score', fontsize=12)
-plt.grid(True, alpha=0.3)
-
-# Set proper axis limits and formatting
-# plt.xlim(0, 32)  # X-axis starts from 0
-# plt.ylim(0, max(fitness_score) * 1.1)  # Y-axis starts from 0 with some padding
-
-# Add statistical reference lines
-plt.axhline(y=min(fitness_score), color='green', linestyle=':', alpha=0.7,
-            label=f'Minimum: {min(fitness_score):.5f}')
-plt.axhline(y=max(fitness_score), color='orange', linestyle=':', alpha=0.7,
-            label=f'Maximum: {max(fitness_score):.5f}')
-plt.axhline(y=np.mean(fitness_score), color='red', linestyle='--', alpha=0.7,
-            label=f'Mean: {np.mean(fitness_score):.5f}')
-plt.axhline(y=np.mean(fitness_score) + np.std(fitness_score), color='purple', linestyle='-.', alpha=0.6,
-            label=f'Mean + Std: {np.mean(fitness_score) + np.std(fitness_score):.5f}')
-plt.axhline(y=np.mean(fitness_score) - np.std(fitness_score), color='purple', linestyle='-.', alpha=0.6,
-            label=f'Mean - Std: {np.mean(fitness_score) - np.std(fitness_score):.5f}')
-
-plt.legend(loc='upper right')
-plt.tight_layout()
-plt.show()
-
-# Figure 2: Execution Time Line Plot
-plt.figure(figsize=(10, 6))
-plt.plot(range(1, 31), execution_time, 'go-', linewidth=2, markersize=6)
-plt.title('Execution Time (30 Runs)', fontweight='bold', fontsize=14)
-plt.xlabel('Run Number', fontsize=12)
-plt.ylabel('Time (seconds)', fontsize=12)
-plt.grid(True, alpha=0.3)
-
-# Set proper axis limits and formatting
-# plt.xlim(0, 32)  # X-axis starts from 0
-# plt.ylim(0, max(execution_time) * 1.1)  # Y-axis starts from 0 with some padding
-
-# Add statistical reference lines
-plt.axhline(y=min(execution_time), color='green', linestyle=':', alpha=0.7,
-            label=f'Minimum: {min(execution_time):.2f}s')
-plt.axhline(y=max(execution_time), color='orange', linestyle=':', alpha=0.7,
-            label=f'Maximum: {max(execution_time):.2f}s')
-plt.axhline(y=np.mean(execution_time), color='red', linestyle='--', alpha=0.7,
-            label=f'Mean: {np.mean(execution_time):.2f}s')
-plt.axhline(y=np.mean(execution_time) + np.std(execution_time), color='purple', linestyle='-.', alpha=0.6,
-            label=f'Mean + Std: {np.mean(execution_time) + np.std(execution_time):.2f}s')
-plt.axhline(y=np.mean(execution_time) - np.std(execution_time), color='purple', linestyle='-.', alpha=0.6,
-            label=f'Mean - Std: {np.mean(execution_time) - np.std(execution_time):.2f}s')
-
-plt.legend(loc='upper right')
-plt.tight_layout()
-plt.show()
-
-# Figure 3: Convergence Curve
-# Compute min, max, tighter padding
-min_val = min(convergence_curve)
-max_val = max(convergence_curve)
-padding = (max_val - min_val) * 0.05 # to be configured
-if padding == 0:
-    padding = 0.00001
-
-# Plot
-plt.figure(figsize=(10, 6))
-plt.plot(iterations, convergence_curve, 'mo-', linewidth=2, markersize=3)
-plt.title('PSO Convergence Curve', fontweight='bold', fontsize=14)
-plt.xlabel('Iterations', fontsize=12)
-plt.ylabel('Best Fitness', fontsize=12)
-plt.ylim(min_val - padding, max_val + padding)
-
-plt.grid(True, alpha=0.3)
-
-# Format Y-axis to show full decimal values (no scientific notation)
-plt.gca().yaxis.set_major_formatter(ScalarFormatter(useOffset=False))
-plt.ticklabel_format(useOffset=False, style='plain')
-
-plt.tight_layout()
-plt.show()
-
-print(f"\nConvergence Analysis:")
-print(f"Initial fitness: {convergence_curve[0]:.6f}")
-print(f"Final fitness: {convergence_curve[-1]:.6f}")
-print(f"Improvement: {((convergence_curve[-1] - convergence_curve[0]) / convergence_curve[0] * 100):.1f}%")
+
+DEFAULT_DB = "run_history.db"
+
+# Optimizers that can be recorded and compared
+ALGORITHMS = ("pso", "fa", "memetic")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    algorithm TEXT NOT NULL,
+    scenario_hash TEXT NOT NULL,
+    params_hash TEXT NOT NULL,
+    params TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    fitness_score REAL NOT NULL,
+    execution_time REAL NOT NULL,
+    convergence BLOB
+);
+CREATE INDEX IF NOT EXISTS idx_runs_algorithm ON runs (algorithm, created_at);
+CREATE INDEX IF NOT EXISTS idx_runs_scenario ON runs (scenario_hash, algorithm);
+CREATE INDEX IF NOT EXISTS idx_runs_params ON runs (params_hash);
+CREATE INDEX IF NOT EXISTS idx_runs_created_at ON runs (created_at);
+"""
+
+
+def _canonical_hash(obj):
+    """ Stable short hash of a JSON-serializable object. """
+    canonical = json.dumps(obj, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(canonical.encode()).hexdigest()[:16]
+
+
+def scenario_hash(barangay_input_data):
+    """ Hash of a /simulate payload that ignores ordering of the barangays. """
+    return _canonical_hash(sorted(barangay_input_data, key=lambda b: b['name']))
+
+
+class RunStore:
+    """
+    SQLite-backed history of optimizer runs. Summaries are computed with SQL
+    aggregates, so they stay fast for thousands of runs.
+    """
+    def __init__(self, path=DEFAULT_DB):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def add_runs(self, runs):
+        """
+        Inserts runs given as dicts with algorithm, scenario_hash, params,
+        fitness_score, execution_time and optionally convergence / created_at.
+        """
+        now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+        rows = []
+        for run in runs:
+            params = run.get('params') or {}
+            convergence = run.get('convergence')
+            rows.append((
+                run['algorithm'],
+                run['scenario_hash'],
+                _canonical_hash(params),
+                json.dumps(params, sort_keys=True),
+                run.get('created_at') or now,
+                float(run['fitness_score']),
+                float(run['execution_time']),
+                np.asarray(convergence, dtype=np.float64).tobytes() if convergence is not None else None,
+            ))
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO runs (algorithm, scenario_hash, params_hash, params, created_at,"
+                " fitness_score, execution_time, convergence) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    def _where(self, algorithm=None, scenario=None, params_hash=None, since=None, until=None):
+        clauses, args = [], []
+        for column, value in (("algorithm", algorithm), ("scenario_hash", scenario), ("params_hash", params_hash)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                args.append(value)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            args.append(since)
+        if until is not None:
+            clauses.append("created_at < ?")
+            args.append(until)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", args
+
+    def scenarios(self, **filters):
+        where, args = self._where(**filters)
+        return [row[0] for row in self.conn.execute(f"SELECT DISTINCT scenario_hash FROM runs{where} ORDER BY scenario_hash", args)]
+
+    def algorithms(self, **filters):
+        where, args = self._where(**filters)
+        return [row[0] for row in self.conn.execute(f"SELECT DISTINCT algorithm FROM runs{where} ORDER BY algorithm", args)]
+
+    def summary(self, **filters):
+        """
+        Count, best/worst/mean/std of fitness and execution time per algorithm
+        and scenario, as {algorithm: {scenario_hash: stats}}; runs of different
+        scenarios are never pooled.
+        """
+        where, args = self._where(**filters)
+        rows = self.conn.execute(
+            "SELECT algorithm, scenario_hash, COUNT(*),"
+            " MAX(fitness_score), MIN(fitness_score), AVG(fitness_score), AVG(fitness_score * fitness_score),"
+            " MIN(execution_time), MAX(execution_time), AVG(execution_time), AVG(execution_time * execution_time)"
+            f" FROM runs{where} GROUP BY algorithm, scenario_hash ORDER BY algorithm, scenario_hash",
+            args,
+        )
+        summaries = {}
+        for algorithm, scenario, count, f_best, f_worst, f_mean, f_sq, t_min, t_max, t_mean, t_sq in rows:
+            summaries.setdefault(algorithm, {})[scenario] = {
+                "runs": count,
+                "fitness": {"best": f_best, "worst": f_worst, "mean": f_mean,
+                            "std": float(np.sqrt(max(f_sq - f_mean ** 2, 0)))},
+                "execution_time": {"min": t_min, "max": t_max, "mean": t_mean,
+                                   "std": float(np.sqrt(max(t_sq - t_mean ** 2, 0)))},
+            }
+        return summaries
+
+    def values(self, column, **filters):
+        """ One numeric column (fitness_score or execution_time) in run order. """
+        if column not in ("fitness_score", "execution_time"):
+            raise ValueError(f"Unknown column: {column!r}")
+        where, args = self._where(**filters)
+        rows = self.conn.execute(f"SELECT {column} FROM runs{where} ORDER BY created_at, id", args)
+        return np.fromiter((row[0] for row in rows), dtype=float)
+
+    def mean_convergence(self, **filters):
+        """
+        Mean best-fitness curve of the selected runs, per curve length, as
+        {length: (runs, mean curve)}. Curves of different lengths (other
+        iteration counts, cancelled runs) are kept apart, not padded.
+        """
+        where, args = self._where(**filters)
+        where += (" AND " if where else " WHERE ") + "convergence IS NOT NULL"
+        by_length = {}
+        for row in self.conn.execute(f"SELECT convergence FROM runs{where}", args):
+            curve = np.frombuffer(row[0], dtype=np.float64)
+            if len(curve):
+                by_length.setdefault(len(curve), []).append(curve)
+        return {length: (len(curves), np.vstack(curves).mean(axis=0))
+                for length, curves in sorted(by_length.items())}
+
+
+# --- Recording and importing runs ---
+
+def record_runs(store, algorithm, barangay_input_data, runs, params=None):
+    """ Runs an optimizer `runs` times on one scenario and stores every result. """
+    import contextlib
+    import PSO
+    import FA
+    import Memetic
+
+    if algorithm == "pso":
+        params = {**PSO.DEFAULT_PSO_PARAMS, **(params or {})}
+        run = lambda: PSO.run_pso_simulation(barangay_input_data, detailed=True, pso_params=params)
+    elif algorithm == "fa":
+        params = {**FA.DEFAULT_FA_PARAMS, **(params or {})}
+        run = lambda: FA.run_fa_simulation(barangay_input_data, detailed=True, fa_params=params)
+    elif algorithm == "memetic":
+        params = {**Memetic.DEFAULT_MEMETIC_PARAMS, **(params or {})}
+        run = lambda: Memetic.run_memetic_simulation(barangay_input_data, detailed=True, pso_params=params)
+    else:
+        raise ValueError(f"Unknown algorithm: {algorithm!r}")
+
+    s_hash = scenario_hash(barangay_input_data)
+    for i in range(runs):
+        # The optimizers log verbosely; keep only one line per run
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            _, fitness_score, execution_time, details = run()
+        store.add_runs([{
+            "algorithm": algorithm, "scenario_hash": s_hash, "params": params,
+            "fitness_score": fitness_score, "execution_time": execution_time,
+            "convergence": details["convergence"],
+        }])
+        print(f"Run {i + 1}/{runs}: fitness {fitness_score:.6f}, time {execution_time:.2f}s")
+    return s_hash
+
+
+def import_csv(store, results_path, convergence_path=None, algorithm="pso", scenario="legacy-csv"):
+    """
+    Imports the legacy per-run CSVs (`Time (s)`, `Fitness Score` columns and
+    an optional `Run_<n>` x `Iteration_<i>` convergence table).
+    """
+    with open(results_path, newline="") as f:
+        results = list(csv.DictReader(f))
+
+    curves = []
+    if convergence_path:
+        with open(convergence_path, newline="") as f:
+            reader = csv.reader(f)
+            next(reader)
+            # The legacy table ends with a precomputed "Mean" row
+            curves = [[float(v) for v in row[1:]] for row in reader if row and row[0].startswith("Run")]
+
+    runs = []
+    for i, row in enumerate(results):
+        runs.append({
+            "algorithm": algorithm, "scenario_hash": scenario, "params": {},
+            "fitness_score": row["Fitness Score"], "execution_time": row["Time (s)"],
+            "convergence": curves[i] if i < len(curves) else None,
+        })
+    return store.add_runs(runs)
+
+
+# --- Statistics and plots (heavy imports happen here, lazily) ---
+
+def common_scenario(store, algorithms, **filters):
+    """
+    The scenario to compare `algorithms` on: the `scenario` filter if given,
+    else the only scenario with runs of all of them. Raises ValueError when
+    there is none or more than one, so runs of different scenarios are
+    never pooled.
+    """
+    if filters.get('scenario'):
+        return filters['scenario']
+    filters.pop('scenario', None)
+    common = None
+    for algorithm in algorithms:
+        found = set(store.scenarios(algorithm=algorithm, **filters))
+        common = found if common is None else common & found
+    common = sorted(common or ())
+    if len(common) == 1:
+        return common[0]
+    if not common:
+        raise ValueError(f"No scenario has runs of {', '.join(algorithms)}")
+    raise ValueError("Runs come from several scenarios, pick one with --scenario: " + ", ".join(common))
+
+
+def compare(store, algorithm_a, algorithm_b, **filters):
+    """
+    Fitness comparison of two algorithms on one scenario (see common_scenario),
+    with a Mann-Whitney U test when scipy is available.
+    """
+    filters['scenario'] = common_scenario(store, (algorithm_a, algorithm_b), **filters)
+    a = store.values("fitness_score", algorithm=algorithm_a, **filters)
+    b = store.values("fitness_score", algorithm=algorithm_b, **filters)
+    result = {"a": algorithm_a, "b": algorithm_b, "scenario": filters['scenario'], "runs_a": len(a), "runs_b": len(b),
+              "mean_difference": float(a.mean() - b.mean()) if len(a) and len(b) else None,
+              "p_value": None}
+    if len(a) and len(b):
+        try:
+            from scipy import stats
+        except ImportError:
+            return result
+        result["p_value"] = float(stats.mannwhitneyu(a, b, alternative="two-sided").pvalue)
+    return result
+
+
+def _pyplot():
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def plot_series(values, title, ylabel, path, unit="", decimals=5):
+    """ Per-run line plot with min/max/mean/std reference lines (as in the original script). """
+    plt = _pyplot()
+    runs = np.arange(1, len(values) + 1)
+    mean, std = values.mean(), values.std()
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.plot(runs, values, 'o-', linewidth=2 if len(values) <= 100 else 0.8, markersize=6 if len(values) <= 100 else 1)
+    ax.set_title(f"{title} ({len(values)} Runs)", fontweight='bold', fontsize=14)
+    ax.set_xlabel('Run Number', fontsize=12)
+    ax.set_ylabel(ylabel, fontsize=12)
+    ax.grid(True, alpha=0.3)
+    for y, style, color, label in ((values.min(), ':', 'green', 'Minimum'),
+                                   (values.max(), ':', 'orange', 'Maximum'),
+                                   (mean, '--', 'red', 'Mean'),
+                                   (mean + std, '-.', 'purple', 'Mean + Std'),
+                                   (mean - std, '-.', 'purple', 'Mean - Std')):
+        ax.axhline(y=y, color=color, linestyle=style, alpha=0.7, label=f"{label}: {y:.{decimals}f}{unit}")
+    ax.legend(loc='upper right')
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+
+
+def plot_convergence(curves, path):
+    """ Mean convergence curves (by label) on one figure. """
+    plt = _pyplot()
+    from matplotlib.ticker import ScalarFormatter
+    fig, ax = plt.subplots(figsize=(10, 6))
+    for label, curve in curves.items():
+        ax.plot(np.arange(1, len(curve) + 1), curve, linewidth=2, label=label.upper())
+    ax.set_title('Convergence Curve', fontweight='bold', fontsize=14)
+    ax.set_xlabel('Iterations', fontsize=12)
+    ax.set_ylabel('Best Fitness', fontsize=12)
+    ax.grid(True, alpha=0.3)
+    ax.yaxis.set_major_formatter(ScalarFormatter(useOffset=False))
+    ax.legend(loc='lower right')
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+
+
+def plot_comparison(values, path):
+    """ Fitness distribution per algorithm as box plots. """
+    plt = _pyplot()
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.boxplot(list(values.values()))
+    ax.set_xticks(range(1, len(values) + 1), [a.upper() for a in values])
+    ax.set_title('Fitness Score by Algorithm', fontweight='bold', fontsize=14)
+    ax.set_ylabel('Fitness Score', fontsize=12)
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+
+
+def render_plots(store, out_dir, **filters):
+    """
+    Writes all figures for the selected runs into `out_dir`; returns the paths.
+    All figures use one scenario (see common_scenario).
+    """
+    algorithm = filters.pop('algorithm', None)
+    algorithms = [algorithm] if algorithm else store.algorithms(**filters)
+    filters['scenario'] = common_scenario(store, algorithms, **filters)
+    os.makedirs(out_dir, exist_ok=True)
+    paths, curves, fitness_by_algorithm = [], {}, {}
+    for algorithm in algorithms:
+        fitness = store.values("fitness_score", algorithm=algorithm, **filters)
+        if not len(fitness):
+            continue
+        fitness_by_algorithm[algorithm] = fitness
+        execution_time = store.values("execution_time", algorithm=algorithm, **filters)
+        for name, values, title, ylabel, unit, decimals in (
+                ("fitness", fitness, f"{algorithm.upper()} Fitness Scores", "Fitness Score", "", 5),
+                ("execution_time", execution_time, f"{algorithm.upper()} Execution Time", "Time (seconds)", "s", 2)):
+            path = os.path.join(out_dir, f"{algorithm}_{name}.png")
+            plot_series(values, title, ylabel, path, unit, decimals)
+            paths.append(path)
+        by_length = store.mean_convergence(algorithm=algorithm, **filters)
+        for length, (_, curve) in by_length.items():
+            label = algorithm if len(by_length) == 1 else f"{algorithm} ({length} iterations)"
+            curves[label] = curve
+    if curves:
+        paths.append(os.path.join(out_dir, "convergence.png"))
+        plot_convergence(curves, paths[-1])
+    if len(fitness_by_algorithm) > 1:
+        paths.append(os.path.join(out_dir, "fitness_comparison.png"))
+        plot_comparison(fitness_by_algorithm, paths[-1])
+    return paths
+
+
+# --- CLI ---
+
+def print_summary(summaries, curves=None):
+    """ `summaries` as from RunStore.summary; `curves[(algorithm, scenario)]` as from mean_convergence. """
+    for algorithm, by_scenario in summaries.items():
+        for scenario, s in by_scenario.items():
+            print(f"\n{algorithm.upper()} Analysis - scenario {scenario} - {s['runs']} Runs")
+            print("=" * 30)
+            f, t = s['fitness'], s['execution_time']
+            print("\nFitness Score Stats:")
+            print(f"Best: {f['best']:.6f}")
+            print(f"Worst: {f['worst']:.6f}")
+            print(f"Mean: {f['mean']:.6f}")
+            print(f"Std: {f['std']:.6f}")
+            print("\nExecution Time Stats:")
+            print(f"Min: {t['min']:.2f}s")
+            print(f"Max: {t['max']:.2f}s")
+            print(f"Mean: {t['mean']:.2f}s")
+            print(f"Std: {t['std']:.2f}s")
+            for length, (runs, curve) in (curves or {}).get((algorithm, scenario), {}).items():
+                print(f"\nConvergence Analysis ({runs} runs of {length} iterations):")
+                print(f"Initial fitness: {curve[0]:.6f}")
+                print(f"Final fitness: {curve[-1]:.6f}")
+                print(f"Improvement: {((curve[-1] - curve[0]) / curve[0] * 100):.1f}%")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record and analyse optimizer runs.")
+    parser.add_argument("--db", default=DEFAULT_DB, help="run-history SQLite database")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_filters(p):
+        p.add_argument("--algorithm", help="only runs of this algorithm")
+        p.add_argument("--scenario", help="only runs of this scenario hash")
+        p.add_argument("--params-hash", help="only runs with this params hash")
+        p.add_argument("--since", help="only runs at or after this ISO date")
+        p.add_argument("--until", help="only runs before this ISO date")
+
+    p = sub.add_parser("record", help="run an optimizer repeatedly and store the results")
+    p.add_argument("--algorithm", choices=ALGORITHMS, default="pso")
+    p.add_argument("--runs", type=int, default=30)
+    p.add_argument("--scenario", help="JSON file with a /simulate payload (default: random scenario)")
+    p.add_argument("--size", type=int, default=6, help="flooded barangays in the random scenario")
+    p.add_argument("--seed", type=int, default=0, help="seed for the random scenario")
+    p.add_argument("--params", default="{}", help='JSON overrides, e.g. \'{"iterations": 100}\'')
+
+    p = sub.add_parser("import-csv", help="import legacy pso_results.csv / convergence.csv")
+    p.add_argument("--results", required=True)
+    p.add_argument("--convergence")
+    p.add_argument("--algorithm", default="pso")
+    p.add_argument("--scenario", default="legacy-csv", help="scenario label to store")
+
+    p = sub.add_parser("summary", help="print summary statistics")
+    add_filters(p)
+    p.add_argument("--json", action="store_true", help="print JSON instead of text")
+
+    p = sub.add_parser("compare", help="compare the fitness of two algorithms")
+    add_filters(p)
+    p.add_argument("--algorithms", default="pso,fa", help=f"two of {', '.join(ALGORITHMS)}, e.g. pso,fa")
+
+    p = sub.add_parser("plot", help="render figures to image files")
+    add_filters(p)
+    p.add_argument("--out", default="plots")
+
+    args = parser.parse_args(argv)
+    store = RunStore(args.db)
+    try:
+        filters = {k: getattr(args, a) for k, a in (("algorithm", "algorithm"), ("scenario", "scenario"),
+                                                   ("params_hash", "params_hash"), ("since", "since"),
+                                                   ("until", "until")) if hasattr(args, a)}
+        if args.command == "record":
+            if args.scenario:
+                with open(args.scenario) as f:
+                    scenario = json.load(f)
+            else:
+                import random
+                import PSO
+                scenario = PSO.ZONE_TABLE.build_scenario(args.size, random.Random(args.seed))
+            s_hash = record_runs(store, args.algorithm, scenario, args.runs, json.loads(args.params))
+            print(f"Stored {args.runs} {args.algorithm.upper()} runs for scenario {s_hash} in {args.db}")
+        elif args.command == "import-csv":
+            count = import_csv(store, args.results, args.convergence, args.algorithm, args.scenario)
+            print(f"Imported {count} runs into {args.db}")
+        elif args.command == "summary":
+            summaries = store.summary(**filters)
+            if args.json:
+                print(json.dumps(summaries, indent=2))
+            else:
+                scoped = {k: v for k, v in filters.items() if k not in ("algorithm", "scenario")}
+                curves = {(a, sc): store.mean_convergence(algorithm=a, scenario=sc, **scoped)
+                          for a, by_scenario in summaries.items() for sc in by_scenario}
+                print_summary(summaries, curves)
+        elif args.command == "compare":
+            algorithms = [a.strip() for a in args.algorithms.split(",")]
+            if len(algorithms) != 2 or len(set(algorithms)) != 2 or not set(algorithms) <= set(ALGORITHMS):
+                parser.error(f"--algorithms takes two different names out of {', '.join(ALGORITHMS)}, "
+                             f"e.g. pso,fa (got {args.algorithms!r})")
+            algorithm_a, algorithm_b = algorithms
+            filters.pop("algorithm", None)
+            result = compare(store, algorithm_a, algorithm_b, **filters)
+            print(f"Scenario {result['scenario']}")
+            print(f"{algorithm_a.upper()}: {result['runs_a']} runs, {algorithm_b.upper()}: {result['runs_b']} runs")
+            if result["mean_difference"] is not None:
+                print(f"Mean fitness difference ({algorithm_a.upper()} - {algorithm_b.upper()}): {result['mean_difference']:.6f}")
+            if result["p_value"] is not None:
+                print(f"Mann-Whitney U p-value: {result['p_value']:.4g}")
+        elif args.command == "plot":
+            for path in render_plots(store, args.out, **filters):
+                print(f"Wrote {path}")
+    except ValueError as e:
+        parser.error(str(e))
+    finally:
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,290 @@
+"""
+Local load-testing harness for the FastAPI service in main.py.
+
+Drives the app either in-process (through httpx's ASGI transport) or against
+a uvicorn server that the harness starts on localhost, one fresh server per
+deployment mode. No external services are needed.
+
+Example:
+    python loadtest.py --modes inline,thread,process --concurrency 8 \\
+        --requests 32 --sizes 6,27 --mix simulate=8,root=1,login=1
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from functools import partial
+
+import httpx # type: ignore
+import numpy as np
+
+import PSO
+
+MODES = ("inline", "thread", "process")
+
+
+def parse_mix(mix):
+    """ Parses "simulate=8,root=1" into ([names], [weights]). """
+    names, weights = [], []
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ("simulate", "root", "login"):
+            raise ValueError(f"Unknown request type in mix: {name!r}")
+        names.append(name)
+        weights.append(float(weight or 1))
+    return names, weights
+
+
+def build_requests(args):
+    """ Pre-builds the full request list so payload generation is not timed. """
+    rng = random.Random(args.seed)
+    names, weights = parse_mix(args.mix)
+    sizes = [int(s) for s in args.sizes.split(",")]
+    requests = []
+    for _ in range(args.requests):
+        kind = rng.choices(names, weights)[0]
+        if kind == "simulate":
+            requests.append(("POST", f"/simulate?algorithm={args.algorithm}", PSO.ZONE_TABLE.build_scenario(rng.choice(sizes), rng)))
+        elif kind == "login":
+            requests.append(("POST", "/login", {"username": "operator", "password": "secret123"}))
+        else:
+            requests.append(("GET", "/", None))
+    return requests
+
+
+def _stat_times(path):
+    """ (own, reaped children) CPU seconds from a /proc/<pid>[/task/<tid>]/stat file. """
+    with open(path) as f:
+        # Fields after the parenthesized command name start at field 3 (state)
+        fields = f.read().rpartition(")")[2].split()
+    ticks = os.sysconf("SC_CLK_TCK")
+    utime, stime, cutime, cstime = (int(x) / ticks for x in fields[11:15])
+    return utime + stime, cutime + cstime
+
+
+def _descendants(pid):
+    """ Pids of all live descendants of `pid`, found by scanning /proc. """
+    parents = {}
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            with contextlib.suppress(OSError):
+                with open(f"/proc/{entry}/stat") as f:
+                    parents.setdefault(int(f.read().rpartition(")")[2].split()[1]), []).append(int(entry))
+    found, stack = [], [pid]
+    while stack:
+        children = parents.get(stack.pop(), [])
+        found.extend(children)
+        stack.extend(children)
+    return found
+
+
+def server_cpu_time(pid, executor_only=False):
+    """
+    CPU seconds used so far by process `pid` and its descendants (pool
+    workers, manager), including descendants that already exited. With
+    `executor_only`, the main thread of `pid` is left out: in-process it runs
+    the load generator, so only worker threads and child processes count.
+    Returns None where /proc is not available.
+    """
+    if not os.path.exists(f"/proc/{pid}/stat"):
+        return None
+    # The process-wide figure keeps the time of threads that already exited
+    # (idle executor threads are retired), so subtract the main thread rather
+    # than summing the threads alive right now
+    own, reaped = _stat_times(f"/proc/{pid}/stat")
+    if executor_only:
+        own -= _stat_times(f"/proc/{pid}/task/{pid}/stat")[0]
+    total = own + reaped
+    for child in _descendants(pid):
+        with contextlib.suppress(OSError):
+            total += sum(_stat_times(f"/proc/{child}/stat"))
+    return total
+
+
+async def drive(client, requests, concurrency, cpu_sampler=None):
+    """
+    Sends all requests with at most `concurrency` in flight at a time.
+    `cpu_sampler` (e.g. server_cpu_time bound to the server pid) is read at
+    the start and end of the run; returns (samples, wall time, cpu time).
+    """
+    queue = asyncio.Queue()
+    for req in requests:
+        queue.put_nowait(req)
+    samples = []
+
+    async def worker():
+        while not queue.empty():
+            method, path, body = queue.get_nowait()
+            start = time.perf_counter()
+            try:
+                res = await client.request(method, path, json=body)
+                status = res.status_code
+            except httpx.HTTPError:
+                status = None
+            samples.append((path, status, time.perf_counter() - start))
+
+    cpu_start = cpu_sampler() if cpu_sampler else None
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall_time = time.perf_counter() - start
+    cpu_end = cpu_sampler() if cpu_sampler else None
+    cpu_time = cpu_end - cpu_start if cpu_start is not None and cpu_end is not None else None
+    return samples, wall_time, cpu_time
+
+
+def summarize(mode, samples, wall_time, cpu_time=None):
+    """
+    Reduces raw (path, status, latency) samples to the report metrics.
+    `cpu_time` is the server-side CPU used during the same `wall_time`.
+    """
+    latencies = np.array([s[2] for s in samples]) * 1000
+    statuses = [s[1] for s in samples]
+    total = len(samples)
+    report = {
+        "mode": mode,
+        "requests": total,
+        "wall_time_s": wall_time,
+        "throughput_rps": total / wall_time if wall_time > 0 else 0,
+        "p50_ms": float(np.percentile(latencies, 50)) if total else 0,
+        "p95_ms": float(np.percentile(latencies, 95)) if total else 0,
+        "p99_ms": float(np.percentile(latencies, 99)) if total else 0,
+        "error_rate": sum(1 for s in statuses if s is None or (s >= 400 and s != 429)) / total if total else 0,
+        "rate_429": sum(1 for s in statuses if s == 429) / total if total else 0,
+    }
+    if cpu_time is not None:
+        # Share of the whole machine the server used during the run
+        report["cpu_s"] = cpu_time
+        report["cpu_util"] = cpu_time / (wall_time * (os.cpu_count() or 1)) if wall_time > 0 else 0
+    return report
+
+
+async def run_inprocess(mode, requests, args):
+    """ Runs the load against main.app inside this process. """
+    import main
+    main.SIMULATION_EXECUTOR = mode
+    main.SIMULATION_WORKERS = args.workers
+    main.MAX_PENDING_SIMULATIONS = args.max_pending
+
+    # The app shares this process with the load generator, so only executor
+    # threads and pool processes are measured; inline runs on the generator's
+    # own thread and gets no CPU figure
+    cpu_sampler = None
+    if mode != "inline":
+        cpu_sampler = partial(server_cpu_time, os.getpid(), executor_only=True)
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=None) as client:
+        samples, wall_time, cpu_time = await drive(client, requests, args.concurrency, cpu_sampler)
+    main.shutdown_process_pool()
+    return summarize(mode, samples, wall_time, cpu_time)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_until_ready(client, server, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("uvicorn exited before becoming ready")
+        with contextlib.suppress(httpx.HTTPError):
+            await client.get("/")
+            return
+        await asyncio.sleep(0.1)
+    raise RuntimeError("uvicorn did not become ready in time")
+
+
+async def run_uvicorn(mode, requests, args):
+    """ Starts a local uvicorn for `mode`, runs the load and stops it again. """
+    port = free_port()
+    env = dict(os.environ,
+               SIMULATION_EXECUTOR=mode,
+               SIMULATION_WORKERS=str(args.workers),
+               MAX_PENDING_SIMULATIONS=str(args.max_pending))
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=None) as client:
+            await wait_until_ready(client, server)
+            # Sampled around the run only, so start-up and shutdown are excluded
+            samples, wall_time, cpu_time = await drive(client, requests, args.concurrency,
+                                                       partial(server_cpu_time, server.pid))
+    finally:
+        server.terminate()
+        server.wait()
+    return summarize(mode, samples, wall_time, cpu_time)
+
+
+async def run_url(requests, args):
+    """ Runs the load against an already running server (no CPU figures). """
+    async with httpx.AsyncClient(base_url=args.url, timeout=None) as client:
+        samples, wall_time, _ = await drive(client, requests, args.concurrency)
+    return summarize(args.url, samples, wall_time)
+
+
+def print_report(reports):
+    print(f"{'mode':<10}{'reqs':>6}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+          f"{'err %':>8}{'429 %':>8}{'cpu %':>8}")
+    for r in reports:
+        cpu = f"{r['cpu_util'] * 100:.1f}" if "cpu_util" in r else "n/a"
+        print(f"{r['mode']:<10}{r['requests']:>6}{r['throughput_rps']:>9.2f}"
+              f"{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['p99_ms']:>10.1f}"
+              f"{r['error_rate'] * 100:>8.1f}{r['rate_429'] * 100:>8.1f}{cpu:>8}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the simulation API locally.")
+    parser.add_argument("--target", choices=("inprocess", "uvicorn"), default="inprocess",
+                        help="drive main.app in-process or through a local uvicorn")
+    parser.add_argument("--url", help="load an already running server instead (ignores --modes)")
+    parser.add_argument("--modes", default="thread",
+                        help="comma-separated SIMULATION_EXECUTOR modes to compare")
+    parser.add_argument("--concurrency", type=int, default=4, help="requests in flight")
+    parser.add_argument("--requests", type=int, default=16, help="total requests per mode")
+    parser.add_argument("--mix", default="simulate=1", help="request mix, e.g. simulate=8,root=1,login=1")
+    parser.add_argument("--sizes", default="6", help="flooded barangays per scenario, e.g. 6,15,27")
+    parser.add_argument("--algorithm", default="pso", help="optimizer used by /simulate requests")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="process pool size")
+    parser.add_argument("--max-pending", type=int, default=0, help="429 threshold (0 = no limit)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for scenario generation")
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    requests = build_requests(args)
+    reports = []
+    if args.url:
+        reports.append(asyncio.run(run_url(requests, args)))
+    else:
+        for mode in args.modes.split(","):
+            if mode not in MODES:
+                parser.error(f"unknown mode {mode!r}, expected one of {', '.join(MODES)}")
+            print(f"Running {len(requests)} requests in '{mode}' mode ({args.target})...")
+            if args.target == "uvicorn":
+                reports.append(asyncio.run(run_uvicorn(mode, requests, args)))
+            else:
+                # The optimizers print verbose logs, keep them out of the report
+                with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                    reports.append(asyncio.run(run_inprocess(mode, requests, args)))
+
+    print()
+    print_report(reports)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(reports, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,64 @@
-from fastapi import FastAPI, HTTPException # type: ignore
+from fastapi import FastAPI, HTTPException, Query, Request # type: ignore
 from fastapi.middleware.cors import CORSMiddleware # type: ignore
 from pydantic import BaseModel, Field # type: ignore
-from typing import List
+from starlette.concurrency import run_in_threadpool # type: ignore
+from concurrent.futures import ProcessPoolExecutor
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import List, Optional
+import asyncio
 import json
+import multiprocessing
+import os
+import threading
 import time
+import uuid
 import PSO
 import FA
+import Memetic
+import Pareto
+import serialization
 
-app = FastAPI()
+# Deployment settings (read once at startup)
+# SIMULATION_EXECUTOR: where /simulate runs the optimizer
+#   "inline"  -> directly on the event loop (blocks other requests)
+#   "thread"  -> in the server's thread pool (default)
+#   "process" -> in a process pool of SIMULATION_WORKERS processes
+# MAX_PENDING_SIMULATIONS: reject with 429 above this many in-flight runs (0 = no limit)
+SIMULATION_EXECUTOR = os.environ.get("SIMULATION_EXECUTOR", "thread")
+SIMULATION_WORKERS = int(os.environ.get("SIMULATION_WORKERS", os.cpu_count() or 1))
+MAX_PENDING_SIMULATIONS = int(os.environ.get("MAX_PENDING_SIMULATIONS", 0))
+
+# How often (seconds) an in-flight simulation checks whether its client left
+DISCONNECT_POLL_INTERVAL = 0.2
+
+# Pareto fronts kept in memory for /pareto queries (oldest are dropped first)
+MAX_STORED_FRONTS = 32
+
+if SIMULATION_EXECUTOR not in ("inline", "thread", "process"):
+    raise ValueError(f"Unknown SIMULATION_EXECUTOR: {SIMULATION_EXECUTOR!r}")
+
+@asynccontextmanager
+async def lifespan(app):
+    """ Stops the process pool (if any) when the server shuts down. """
+    yield
+    shutdown_process_pool()
+
+
+app = FastAPI(lifespan=lifespan)
+
+# Process pool is created lazily so importing main stays cheap
+_process_pool = None
+_process_manager = None
+_pending_simulations = 0
+
+# In-flight simulations by job id, and the latest job id per session
+_jobs = {}
+_session_jobs = {}
+
+# Pareto archives from multi-objective runs, by front id (= job id)
+_pareto_fronts = OrderedDict()
 
 app.add_middleware(
     CORSMiddleware,
@@ -33,6 +84,14 @@ class LoginRequest(BaseModel):
     username: str = Field(..., min_length=3, max_length=50)
     password: str = Field(..., min_length=6)
 
+# Objective weights used to pick a solution from a Pareto front
+class ObjectiveWeights(BaseModel):
+    w1: float = Field(0.2, ge=0)
+    w2: float = Field(0.2, ge=0)
+    w3: float = Field(0.2, ge=0)
+    w4: float = Field(0.2, ge=0)
+    w5: float = Field(0.2, ge=0)
+
 
 # Root route
 @app.get("/")
@@ -48,25 +107,228 @@ def login(data: LoginRequest):
 
     return {"message": f"Welcome, {data.username}!"}
 
+def get_process_pool():
+    """ Returns the shared process pool, creating it on first use. """
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=SIMULATION_WORKERS)
+    return _process_pool
+
+
+def get_process_manager():
+    """ Returns the shared multiprocessing manager used for cross-process cancel events. """
+    global _process_manager
+    if _process_manager is None:
+        _process_manager = multiprocessing.Manager()
+    return _process_manager
+
+
+def shutdown_process_pool():
+    """ Stops the process pool workers (if any were started). """
+    global _process_pool, _process_manager
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=True)
+        _process_pool = None
+    if _process_manager is not None:
+        _process_manager.shutdown()
+        _process_manager = None
+
+
+class SimulationJob:
+    """
+    An in-flight /simulate call that can be cancelled. The optimizers poll
+    `should_stop` once per iteration, so cancelling frees the CPU within one
+    iteration (except in "inline" mode, where nothing else runs meanwhile).
+    """
+    def __init__(self, job_id, session_id):
+        self.job_id = job_id
+        self.session_id = session_id
+        self.reason = None
+        # Process workers cannot see a threading.Event, so use a manager proxy there
+        if SIMULATION_EXECUTOR == "process":
+            self.cancel_event = get_process_manager().Event()
+        else:
+            self.cancel_event = threading.Event()
+        self.should_stop = self.cancel_event.is_set
+
+    def cancel(self, reason):
+        if self.reason is None:
+            self.reason = reason
+            print(f"Cancelling simulation {self.job_id}: {reason}")
+        self.cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self.reason is not None
+
+
+def register_job(job_id, session_id):
+    """ Registers a new job, superseding any earlier job in the same session. """
+    if job_id in _jobs:
+        raise HTTPException(status_code=409, detail=f"Simulation '{job_id}' is already running")
+    job = SimulationJob(job_id, session_id)
+    if session_id is not None:
+        previous = _jobs.get(_session_jobs.get(session_id))
+        if previous is not None:
+            previous.cancel("superseded by a newer request")
+        _session_jobs[session_id] = job_id
+    _jobs[job_id] = job
+    return job
+
+
+def unregister_job(job):
+    _jobs.pop(job.job_id, None)
+    if _session_jobs.get(job.session_id) == job.job_id:
+        del _session_jobs[job.session_id]
+
+
+async def watch_disconnect(request, job):
+    """ Cancels `job` if the client disconnects before it finishes. """
+    while not job.cancelled:
+        if await request.is_disconnected():
+            job.cancel("client disconnected")
+            return
+        await asyncio.sleep(DISCONNECT_POLL_INTERVAL)
+
+
+async def run_simulation(func, *args):
+    """ Runs an optimizer function using the configured SIMULATION_EXECUTOR. """
+    if SIMULATION_EXECUTOR == "inline":
+        return func(*args)
+    if SIMULATION_EXECUTOR == "process":
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_process_pool(), func, *args)
+    return await run_in_threadpool(func, *args)
+
+
+# Optimizers selectable through /simulate?algorithm=...
+SIMULATION_ALGORITHMS = {
+    "pso": PSO.run_pso_simulation,
+    "fa": FA.run_fa_simulation,
+    "memetic": Memetic.run_memetic_simulation,
+    "pareto": Pareto.run_pareto_simulation,
+}
+
+# Algorithms whose result carries a Pareto archive as its last element
+MULTI_OBJECTIVE_ALGORITHMS = {"pareto"}
+
+
+def store_pareto_front(front_id, archive):
+    _pareto_fronts[front_id] = archive
+    _pareto_fronts.move_to_end(front_id)
+    while len(_pareto_fronts) > MAX_STORED_FRONTS:
+        _pareto_fronts.popitem(last=False)
+
+
+def get_pareto_front(front_id):
+    archive = _pareto_fronts.get(front_id)
+    if archive is None:
+        raise HTTPException(status_code=404, detail=f"No Pareto front '{front_id}'")
+    return archive
+
+
 # Simulate endpoint to process barangay data
+# - algorithm: one of SIMULATION_ALGORITHMS (defaults to PSO)
+# - session_id: a newer request in the same session cancels the older one
+# - job_id: lets the client cancel the run through /simulate/{job_id}/cancel
+# - return_partial: return the best-so-far result when cancelled instead of 409
+# - format: "json" (name-keyed, default) or "compact" (columnar arrays plus
+#   initial state, iteration log and convergence trace; fast encoder and
+#   gzip/brotli as accepted by the client)
+# Multi-objective runs also return a front_id for the /pareto endpoints
 @app.post("/simulate")
-def simulate(barangays: List[BarangayData]):
+async def simulate(
+    barangays: List[BarangayData],
+    request: Request,
+    algorithm: str = "pso",
+    session_id: Optional[str] = None,
+    job_id: Optional[str] = None,
+    return_partial: bool = False,
+    response_format: str = Query("json", alias="format"),
+):
+    global _pending_simulations
     print("Received barangay data for simulation...")
 
-    # Convert Pydantic objects to a list of simple dictionaries
-    barangay_input_data = [b.model_dump() for b in barangays]
+    if algorithm not in SIMULATION_ALGORITHMS:
+        raise HTTPException(status_code=400, detail=f"Unknown algorithm '{algorithm}'")
+    if response_format not in ("json", "compact"):
+        raise HTTPException(status_code=400, detail=f"Unknown format '{response_format}'")
+
+    # Shed load instead of queueing without bound
+    if MAX_PENDING_SIMULATIONS and _pending_simulations >= MAX_PENDING_SIMULATIONS:
+        raise HTTPException(status_code=429, detail="Too many simulations in progress, try again later")
+
+    # Resolve each barangay to its zone index once; the optimizers work on
+    # the resulting arrays instead of name-keyed dictionaries
+    try:
+        zone_input = PSO.ZONE_TABLE.load(barangays)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    job = register_job(job_id or uuid.uuid4().hex, session_id)
+    watcher = asyncio.create_task(watch_disconnect(request, job))
 
     # Call the run_[algo]_simulation function from the algorithm module
     print("--------------------------------------------------------")
-    print("\nStarting PSO simulation...")
-    pso_result = PSO.run_pso_simulation(barangay_input_data)
-    print("PSO simulation finished.\n")
+    print(f"\nStarting {algorithm.upper()} simulation...")
+    _pending_simulations += 1
+    try:
+        run = partial(SIMULATION_ALGORITHMS[algorithm], detailed=(response_format == "compact"))
+        result = await run_simulation(run, zone_input, job.should_stop)
+    finally:
+        _pending_simulations -= 1
+        watcher.cancel()
+        unregister_job(job)
+    print(f"{algorithm.upper()} simulation finished.\n")
     print("--------------------------------------------------------")
-    # print("\nStarting FA simulation...")
-    # fa_result = FA.run_fa_simulation(barangay_input_data)
-    # print("FA simulation finished.")
-    # print("--------------------------------------------------------")
-
-    # Result is in array format:
-    # [Barangay Name, Personnel Allocation (SRR, Health, Log), Fitness Score, Execution Time]
-    return {"message": {"pso": pso_result}}
+
+    if algorithm in MULTI_OBJECTIVE_ALGORITHMS:
+        archive = result.pop()
+
+    if job.cancelled and not return_partial:
+        raise HTTPException(status_code=409, detail=f"Simulation was cancelled: {job.reason}")
+
+    # Only store fronts whose front_id reaches the client
+    if algorithm in MULTI_OBJECTIVE_ALGORITHMS:
+        store_pareto_front(job.job_id, archive)
+
+    if response_format == "compact":
+        response = serialization.to_compact(algorithm, result, zone_input.id_by_name())
+    else:
+        # Result is in array format:
+        # [Barangay Name, Personnel Allocation (SRR, Health, Log), Fitness Score, Execution Time]
+        response = {"message": {algorithm: result}}
+    response["job_id"] = job.job_id
+    if algorithm in MULTI_OBJECTIVE_ALGORITHMS:
+        response["front_id"] = job.job_id
+        response["front_size"] = len(archive)
+    if job.cancelled:
+        response["cancelled"] = job.reason
+
+    if response_format == "compact":
+        return serialization.compact_response(response, request.headers.get("accept-encoding"))
+    return response
+
+
+# Cancel an in-flight simulation started with the given job_id
+@app.post("/simulate/{job_id}/cancel")
+async def cancel_simulation(job_id: str):
+    job = _jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"No running simulation '{job_id}'")
+    job.cancel("cancelled through the API")
+    return {"message": f"Simulation '{job_id}' cancelled"}
+
+
+# Objective values of every solution on a stored Pareto front
+@app.get("/pareto/{front_id}")
+def pareto_front(front_id: str):
+    archive = get_pareto_front(front_id)
+    return {"message": {"front": archive.front()}}
+
+
+# Best stored solution for a weight vector, without re-running the optimizer
+@app.post("/pareto/{front_id}/select")
+def pareto_select(front_id: str, weights: ObjectiveWeights):
+    archive = get_pareto_front(front_id)
+    return {"message": archive.select(weights.model_dump())}
@@ -0,0 +1,130 @@
+"""
+Compact columnar encoding of simulation results for /simulate?format=compact.
+
+Instead of name-keyed nested dicts, allocations are sent as one array of
+zone ids plus parallel integer arrays per personnel type, and traces as
+plain numeric arrays. Bodies are encoded with orjson and compressed with
+brotli or gzip when the client accepts it; both are optional and fall back
+to the standard library json / identity encoding.
+"""
+
+import gzip
+import json
+
+import numpy as np
+from starlette.responses import Response # type: ignore
+
+try:
+    import orjson # type: ignore
+except ImportError:
+    orjson = None
+
+try:
+    import brotli # type: ignore
+except ImportError:
+    brotli = None
+
+P_TYPES = ['srr', 'health', 'log']
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 1024
+
+
+def allocation_columns(allocation, zone_names):
+    """ Name-keyed allocation -> {"srr": [...], "health": [...], "log": [...]} in zone order. """
+    return {
+        p_type: np.fromiter((allocation[name][p_type] for name in zone_names), dtype=np.int64, count=len(zone_names))
+        for p_type in P_TYPES
+    }
+
+
+def to_compact(algorithm, result, zone_ids):
+    """
+    Converts a run_[algo]_simulation result (with details) into the compact
+    columnar shape. `zone_ids` maps barangay names to the request ids.
+    """
+    allocation, fitness_score, execution_time = result[:3]
+    details = result[3] if len(result) > 3 else {}
+    zone_names = list(allocation)
+
+    compact = {
+        "format": "compact",
+        "algorithm": algorithm,
+        "zone_ids": [zone_ids.get(name, name) for name in zone_names],
+        "fitness_score": fitness_score,
+        "execution_time": execution_time,
+        **allocation_columns(allocation, zone_names),
+    }
+
+    initial_state = details.get("initial_state")
+    if initial_state:
+        compact["initial"] = {
+            "fitness_score": initial_state["fitness_score"],
+            **allocation_columns(initial_state["allocation"], zone_names),
+        }
+
+    iteration_log = details.get("iteration_log", [])
+    if iteration_log:
+        # Rows are iterations, columns follow zone_ids
+        columns = [allocation_columns(entry["allocation"], zone_names) for entry in iteration_log]
+        compact["iteration_log"] = {
+            "iteration": np.array([entry["iteration"] for entry in iteration_log], dtype=np.int64),
+            "fitness_score": np.array([entry["fitness_score"] for entry in iteration_log]),
+            **{p_type: np.stack([c[p_type] for c in columns]) for p_type in P_TYPES},
+        }
+
+    if "convergence" in details:
+        compact["convergence"] = np.asarray(details["convergence"], dtype=float)
+    return compact
+
+
+def _json_default(obj):
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content):
+    """ Encodes `content` (which may contain numpy arrays) to JSON bytes. """
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, separators=(",", ":"), default=_json_default).encode()
+
+
+def negotiate_encoding(accept_encoding):
+    """ Picks "br", "gzip" or None from an Accept-Encoding header. """
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+
+    candidates = [("br", brotli is not None), ("gzip", True)]
+    wildcard = accepted.get("*", 0)
+    best, best_q = None, 0
+    for coding, available in candidates:
+        q = accepted.get(coding, wildcard)
+        if available and q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compact_response(content, accept_encoding=None):
+    """ Builds a JSON Response with fast encoding and negotiated compression. """
+    body = dumps(content)
+    headers = {"Vary": "Accept-Encoding"}
+    encoding = negotiate_encoding(accept_encoding) if len(body) >= MIN_COMPRESS_SIZE else None
+    if encoding == "br":
+        body = brotli.compress(body, quality=4)
+        headers["Content-Encoding"] = "br"
+    elif encoding == "gzip":
+        body = gzip.compress(body, compresslevel=5)
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=body, media_type="application/json", headers=headers)
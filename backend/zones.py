@@ -0,0 +1,107 @@
+import unicodedata
+
+import numpy as np
+
+P_TYPES = ['srr', 'health', 'log']
+
+
+def normalize_name(name):
+    """ Comparison key for barangay names: "Pag-Asa" == "Pag-asa", "New Zañiga" == "New Zaniga". """
+    decomposed = unicodedata.normalize('NFKD', name)
+    return ''.join(ch for ch in decomposed if ch.isalnum()).casefold()
+
+
+class ZoneTable:
+    """
+    Dense integer index over a static barangay table. Zone ids are the
+    1-based positions in the table, matching the ids the frontend sends.
+    """
+    def __init__(self, barangay_data):
+        self.names = list(barangay_data)
+        self.ids = [str(i + 1) for i in range(len(self.names))]
+        self.index_by_id = {zone_id: i for i, zone_id in enumerate(self.ids)}
+        self.index_by_name = {normalize_name(name): i for i, name in enumerate(self.names)}
+        self.population = np.array([barangay_data[name]['population'] for name in self.names], dtype=float)
+        self.risk = np.array([barangay_data[name]['risk'] for name in self.names], dtype=float)
+
+    def __len__(self):
+        return len(self.names)
+
+    def index_of(self, zone_id, name=None):
+        """
+        Resolves a zone by id, falling back to its name; None if unknown.
+        Raises ValueError when a known id and the given name disagree.
+        """
+        idx = self.index_by_id.get(zone_id)
+        if idx is None:
+            return self.index_by_name.get(normalize_name(name)) if name else None
+        if name and normalize_name(name) != normalize_name(self.names[idx]):
+            raise ValueError(f"Barangay id '{zone_id}' is '{self.names[idx]}', not '{name}'")
+        return idx
+
+    def build_scenario(self, size, rng):
+        """
+        Builds a /simulate payload with `size` randomly flooded zones and
+        random personnel (`rng` is a random.Random), for benchmarks and tests.
+        """
+        flooded = set(rng.sample(self.names, min(size, len(self.names))))
+        return [
+            {
+                "id": zone_id,
+                "name": name,
+                "waterLevel": rng.randint(1, 5) if name in flooded else 0,
+                "personnel": {
+                    "srr": rng.randint(0, 500),
+                    "health": rng.randint(0, 500),
+                    "log": rng.randint(0, 500),
+                },
+            }
+            for zone_id, name in zip(self.ids, self.names)
+        ]
+
+    def load(self, barangays):
+        """
+        Resolves each barangay once and loads its water level and personnel
+        into preallocated arrays. Accepts BarangayData models or plain dicts;
+        raises ValueError if an id and name disagree (see index_of).
+        """
+        n = len(self.names)
+        water_levels = np.zeros(n)
+        # The extra last row pools personnel from zones not in the table;
+        # they still count towards the city-wide totals
+        personnel = np.zeros((n + 1, len(P_TYPES)), dtype=np.int64)
+        ids = list(self.ids)
+        records = []
+        for b in barangays:
+            if not isinstance(b, dict):
+                b = b.model_dump()
+            records.append(b)
+            zone_id, name, water_level = b.get('id'), b.get('name'), b['waterLevel']
+            counts = [b['personnel'][p_type] for p_type in P_TYPES]
+            idx = self.index_of(zone_id, name)
+            if idx is None:
+                personnel[n] += counts
+            else:
+                water_levels[idx] = water_level
+                personnel[idx] = counts
+                ids[idx] = zone_id
+        return ZoneInput(self.names, water_levels, personnel, ids, records)
+
+
+class ZoneInput:
+    """
+    One request's scenario as arrays aligned with a ZoneTable: water level
+    per zone, personnel per zone (plus one row for unlisted zones) and the
+    id the client used for each zone. `records` keeps the request as given,
+    for optimizers with their own name-keyed tables (FA).
+    """
+    def __init__(self, names, water_levels, personnel, ids, records):
+        self.names = names
+        self.water_levels = water_levels
+        self.personnel = personnel
+        self.ids = ids
+        self.records = records
+
+    def id_by_name(self):
+        """ Maps table names back to the client's zone ids (for serialization). """
+        return dict(zip(self.names, self.ids))
@@ -14,6 +14,9 @@ import { initialBarangays } from "@/barangays";
 import { useMutation } from "@/hooks/useMutation";
 import { useAutoAnimate } from "@formkit/auto-animate/react";
 
+// Identifies this browser tab so a newer simulation supersedes an older one
+const sessionId = crypto.randomUUID();
+
 interface ActionButtonsProps {
   barangays: BarangayData[];
   setBarangays: (data: BarangayData[]) => void;
@@ -38,7 +41,8 @@ export function ActionButtons({ barangays, setBarangays }: ActionButtonsProps) {
   const handleSubmit = async () => {
     try {
       await runSimulation(barangays);
-    } catch {
+    } catch (err) {
+      if (err instanceof DOMException && err.name === "AbortError") return;
       console.error("Simulation failed.");
     }
   };
@@ -54,11 +58,12 @@ export function ActionButtons({ barangays, setBarangays }: ActionButtonsProps) {
       },
     }));
     setBarangays(randomizedBarangays);
-    reset(); // Clear any previous simulation results
+    reset(); // Cancel any running simulation and clear previous results
   };
 
   async function simulate(
-    barangays: BarangayData[]
+    barangays: BarangayData[],
+    signal: AbortSignal
   ): Promise<SimulationResult> {
     // Strip frontend-only `coordinates` field
     const payload = barangays.map(({ id, name, waterLevel, personnel }) => ({
@@ -68,12 +73,15 @@ export function ActionButtons({ barangays, setBarangays }: ActionButtonsProps) {
       personnel,
     }));
 
-    const res = await fetch("http://localhost:8000/simulate", {
+    // Aborting the request disconnects it, which stops the run on the server
+    const params = new URLSearchParams({ session_id: sessionId });
+    const res = await fetch(`http://localhost:8000/simulate?${params}`, {
       method: "POST",
       headers: {
         "Content-Type": "application/json",
       },
       body: JSON.stringify(payload),
+      signal,
     });
 
     if (!res.ok) {
@@ -204,7 +212,6 @@ export function ActionButtons({ barangays, setBarangays }: ActionButtonsProps) {
             <Button
               onClick={handleReset}
               variant="outline"
-              disabled={isSubmitting}
               className="h-11 px-6 border-2 hover:bg-slate-50"
             >
               <RotateCcw className="w-4 h-4 mr-2" />
@@ -214,7 +221,6 @@ export function ActionButtons({ barangays, setBarangays }: ActionButtonsProps) {
             <Button
               onClick={handleRandomize}
               variant="outline"
-              disabled={isSubmitting}
               className="h-11 px-6 border-2 border-purple-200 text-purple-700 hover:bg-purple-50 hover:border-purple-300"
             >
               <Shuffle className="w-4 h-4 mr-2" />
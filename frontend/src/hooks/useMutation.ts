@@ -1,6 +1,9 @@
-import { useState } from "react";
+import { useRef, useState } from "react";
 
-type MutationFn<TData, TVariables> = (variables: TVariables) => Promise<TData>;
+type MutationFn<TData, TVariables> = (
+  variables: TVariables,
+  signal: AbortSignal
+) => Promise<TData>;
 
 export function useMutation<TData, TVariables>(
   mutationFn: MutationFn<TData, TVariables>
@@ -8,26 +11,43 @@ export function useMutation<TData, TVariables>(
   const [data, setData] = useState<TData | null>(null);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<unknown>(null);
+  const controllerRef = useRef<AbortController | null>(null);
 
   const mutate = async (variables: TVariables) => {
+    // A new call supersedes any call still in flight
+    controllerRef.current?.abort();
+    const controller = new AbortController();
+    controllerRef.current = controller;
+
     setLoading(true);
     setError(null);
     try {
-      const result = await mutationFn(variables);
+      const result = await mutationFn(variables, controller.signal);
       setData(result);
       return result;
     } catch (err) {
-      setError(err);
+      if (!controller.signal.aborted) setError(err);
       throw err;
     } finally {
-      setLoading(false);
+      if (controllerRef.current === controller) {
+        controllerRef.current = null;
+        setLoading(false);
+      }
     }
   };
 
+  // Aborts the in-flight call (if any) so the server can stop working on it
+  const abort = () => {
+    controllerRef.current?.abort();
+    controllerRef.current = null;
+    setLoading(false);
+  };
+
   const reset = () => {
+    abort();
     setData(null);
     setError(null);
   };
 
-  return { mutate, data, loading, error, reset };
+  return { mutate, data, loading, error, reset, abort };
 }